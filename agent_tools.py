@@ -3,9 +3,18 @@ Tool definitions and implementations for the agentic bot.
 
 These tools give Claude direct access to the knowledge base.
 """
+import functools
+import heapq
+import json
+import logging
+import mmap
 import os
 import shutil
 import subprocess
+import uuid
+from bisect import bisect_right
+from collections import OrderedDict
+from operator import itemgetter
 from typing import List, Dict, Optional
 from datetime import datetime, date, timedelta
 from pathlib import Path
@@ -15,6 +24,7 @@ from storage import (
     move_entry as storage_move_entry,
     delete_entry as storage_delete_entry,
     get_entry_by_id,
+    get_entries_by_ids,
     log_audit,
     add_journal_ref_to_entry,
 )
@@ -25,15 +35,37 @@ from config import (
     JOURNAL_AUDIO_DIR,
     DEFAULT_REMINDER_HOUR,
     LOG_FILE,
+    STORAGE_FILES,
 )
 import journal_storage
 import reminder_storage
 import skills_manager
 import deploy_manager
 
+logger = logging.getLogger(__name__)
+
+# External binaries resolved once instead of a $PATH stat-walk per call
+_RG_PATH = shutil.which("rg")
+_GIT_PATH = shutil.which("git") or "git"
+
+# Upper bound on stored message / search query length. Telegram caps text
+# messages at 4096 chars, so anything near this size is malformed input;
+# rejecting it up front avoids pointless embedding, enrichment and I/O.
+MAX_MSG_LEN = 32_768
+
 
 # Tool definitions for Claude API
-TOOL_DEFINITIONS = [
+# Shared by every category-typed field in the tool schemas below, so the
+# list of valid categories lives in one place.
+_CATEGORY_ENUM = ["people", "projects", "ideas", "admin", "inbox"]
+
+# Fast membership checks for the same enum; the API enforces the enum in
+# tool calls, but direct callers of these functions bypass the schema.
+_VALID_CATEGORIES = frozenset(_CATEGORY_ENUM)
+
+# A tuple so the schema can't be accidentally mutated after import; the
+# Anthropic client accepts any iterable of tool dicts.
+TOOL_DEFINITIONS = (
     {
         "name": "list_entries",
         "description": "List all entries in a specific category (people, projects, ideas, admin, inbox). Returns the actual stored data.",
@@ -42,7 +74,7 @@ TOOL_DEFINITIONS = [
             "properties": {
                 "category": {
                     "type": "string",
-                    "enum": ["people", "projects", "ideas", "admin", "inbox"],
+                    "enum": _CATEGORY_ENUM,
                     "description": "Category to list entries from"
                 },
                 "limit": {
@@ -68,7 +100,7 @@ TOOL_DEFINITIONS = [
                     "type": "array",
                     "items": {
                         "type": "string",
-                        "enum": ["people", "projects", "ideas", "admin", "inbox"]
+                        "enum": _CATEGORY_ENUM
                     },
                     "description": "Categories to search in (default: all)"
                 },
@@ -103,7 +135,7 @@ TOOL_DEFINITIONS = [
             "properties": {
                 "category": {
                     "type": "string",
-                    "enum": ["people", "projects", "ideas", "admin", "inbox"],
+                    "enum": _CATEGORY_ENUM,
                     "description": "Category to store the entry in"
                 },
                 "message": {
@@ -132,12 +164,12 @@ TOOL_DEFINITIONS = [
                 },
                 "from_category": {
                     "type": "string",
-                    "enum": ["people", "projects", "ideas", "admin", "inbox"],
+                    "enum": _CATEGORY_ENUM,
                     "description": "Current category"
                 },
                 "to_category": {
                     "type": "string",
-                    "enum": ["people", "projects", "ideas", "admin", "inbox"],
+                    "enum": _CATEGORY_ENUM,
                     "description": "Target category"
                 }
             },
@@ -156,7 +188,7 @@ TOOL_DEFINITIONS = [
                 },
                 "category": {
                     "type": "string",
-                    "enum": ["people", "projects", "ideas", "admin", "inbox"],
+                    "enum": _CATEGORY_ENUM,
                     "description": "Category containing the entry"
                 }
             },
@@ -417,6 +449,10 @@ TOOL_DEFINITIONS = [
                 "max_results": {
                     "type": "integer",
                     "description": "Max results to return (default: 20)"
+                },
+                "file_type": {
+                    "type": "string",
+                    "description": "Optional ripgrep file type filter (e.g. 'py', 'md')"
                 }
             },
             "required": ["query"]
@@ -553,332 +589,522 @@ TOOL_DEFINITIONS = [
             "required": []
         }
     }
-]
+)
+
+# Pre-serialized form of the (static) schema above, so callers that can
+# send raw JSON bytes don't re-encode the whole tuple on every API request.
+TOOL_DEFINITIONS_JSON: bytes = json.dumps(
+    TOOL_DEFINITIONS, separators=(",", ":")
+).encode()
+
+
+# Resolved once: .resolve() walks the filesystem to chase symlinks and
+# _resolve_repo_path runs on every repo tool call.
+_BASE_RESOLVED = BASE_DIR.resolve()
+
+
+_BASE_PREFIX = str(_BASE_RESOLVED) + os.sep
+
+
+def _rel_to_base(path_str: str) -> str:
+    """Repo-relative display path without touching the filesystem.
+
+    Search results come from paths that already went through
+    _resolve_repo_path, so a prefix strip covers the normal case and the
+    string-only relpath handles anything odd.
+    """
+    if path_str.startswith(_BASE_PREFIX):
+        return path_str[len(_BASE_PREFIX):]
+    return os.path.relpath(path_str, _BASE_PREFIX[:-1])
 
 
 def _resolve_repo_path(path_str: str) -> Path:
-    base = BASE_DIR.resolve()
     path = Path(path_str)
     if not path.is_absolute():
-        path = (base / path).resolve()
+        path = (_BASE_RESOLVED / path).resolve()
     else:
         path = path.resolve()
-    if not str(path).startswith(str(base)):
+    # Component-wise containment check; a plain startswith would accept
+    # sibling directories that share the prefix (e.g. /repo vs /repo-other)
+    if not path.is_relative_to(_BASE_RESOLVED):
         raise ValueError("Path outside repository")
     return path
 
 
 # Tool implementations
 
+def _tool_result(fn):
+    """Wrap a tool so any unexpected exception becomes an error envelope."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    return wrapper
+
+
+def _parse_iso_dt(value: str) -> datetime:
+    """Parse an ISO timestamp, tolerating a trailing 'Z' suffix."""
+    # Only the 'Z' form needs rewriting; the common case parses directly
+    # without allocating an intermediate string.
+    if value.endswith("Z"):
+        return datetime.fromisoformat(value[:-1] + "+00:00")
+    return datetime.fromisoformat(value)
+
+
+@_tool_result
 def list_entries(category: str, limit: Optional[int] = None) -> Dict:
     """List entries in a category."""
-    try:
-        entries = get_all_entries(category)
+    if category not in _VALID_CATEGORIES:
+        return {"success": False, "error": f"Unknown category: {category}"}
 
-        if limit:
-            entries = entries[:limit]
+    entries = get_all_entries(category, limit=limit)
 
-        return {
-            "success": True,
-            "category": category,
-            "count": len(entries),
-            "entries": entries
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    return {
+        "success": True,
+        "category": category,
+        "count": len(entries),
+        "entries": entries
+    }
 
 
-def search_entries(query: str, categories: Optional[List[str]] = None, limit: int = 10) -> Dict:
-    """Search for entries matching query using semantic search + keyword fallback."""
-    if categories is None:
-        categories = CATEGORIES + ["inbox"]
+# Lazily bound embeddings helpers. The first search pays the (potentially
+# heavy) module import once; subsequent calls use the bound references
+# instead of re-running the import machinery per call.
+_semantic_search = None
+_get_embedding_stats = None
 
-    try:
-        # Try semantic search first
+
+def _ensure_embeddings():
+    global _semantic_search, _get_embedding_stats
+    if _semantic_search is None:
         from embeddings import semantic_search, get_embedding_stats
+        _semantic_search = semantic_search
+        _get_embedding_stats = get_embedding_stats
 
-        stats = get_embedding_stats()
-        use_semantic = stats.get("total", 0) > 0
-
-        semantic_results = []
-        if use_semantic:
-            # Get semantic matches with similarity scores
-            semantic_matches = semantic_search(query, categories, limit * 2)
-
-            # Fetch full entries for semantic matches
-            for entry_id, similarity in semantic_matches:
-                result = get_entry_by_id(entry_id)
-                if result:
-                    entry, category = result
-                    entry_with_meta = entry.copy()
-                    entry_with_meta["_category"] = category
-                    entry_with_meta["_similarity"] = similarity
-                    entry_with_meta["_search_method"] = "semantic"
-                    semantic_results.append(entry_with_meta)
-
-        # Also do keyword search for completeness
-        query_lower = query.lower()
-        keyword_matches = []
 
-        for category in categories:
-            entries = get_all_entries(category)
-            for entry in entries:
-                msg = entry.get("raw_message", "").lower()
-                if query_lower in msg:
-                    # Skip if already in semantic results
-                    entry_id = entry.get("id")
-                    if not any(r.get("id") == entry_id for r in semantic_results):
-                        entry_with_cat = entry.copy()
-                        entry_with_cat["_category"] = category
-                        entry_with_cat["_search_method"] = "keyword"
-                        keyword_matches.append(entry_with_cat)
-
-        # Combine results: semantic first (sorted by similarity), then keyword (by date)
-        keyword_matches.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-        all_matches = semantic_results + keyword_matches
+# Pre-lowercased scan structures for the keyword fallback, keyed by the
+# backing file's mtime so repeat queries against unchanged categories skip
+# the per-entry .lower() entirely. Messages are joined into one contiguous
+# NUL-separated blob so the whole category is swept by a single C-level
+# str.find loop instead of a Python-level `in` check per entry.
+_SCAN_CACHE: dict = {}
 
-        return {
-            "success": True,
-            "query": query,
-            "count": len(all_matches),
-            "entries": all_matches[:limit],
-            "search_method": "semantic+keyword" if use_semantic else "keyword",
-            "embedding_stats": stats if use_semantic else None
-        }
 
-    except Exception as e:
+def _scan_rows(category: str) -> tuple:
+    """Return (entries, blob, starts, newest_ts) for a category, memoized by mtime."""
+    path = STORAGE_FILES.get(category)
+    try:
+        mtime = path.stat().st_mtime_ns if path else None
+    except FileNotFoundError:
+        mtime = None
+
+    cached = _SCAN_CACHE.get(category)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    entries = get_all_entries(category)
+    msgs = [entry.get("raw_message", "").lower() for entry in entries]
+    blob = "\x00".join(msgs)
+    # starts[i] is the blob offset where entry i's message begins
+    starts = []
+    offset = 0
+    for msg in msgs:
+        starts.append(offset)
+        offset += len(msg) + 1
+
+    newest = max((entry.get("timestamp", "") for entry in entries), default="")
+    result = (entries, blob, starts, newest)
+    _SCAN_CACHE[category] = (mtime, result)
+    return result
+
+
+def _scan_category(category: str, query_lower: str) -> list:
+    """Yield entries whose message contains query_lower, via one blob sweep."""
+    if "\x00" in query_lower:
+        # NUL is the row separator; no stored message can match it anyway
+        return []
+    entries, blob, starts, _ = _scan_rows(category)
+    if not query_lower:
+        # "" is a substring of every message, matching the old per-entry
+        # `in` check; it must not reach the sweep below, where find("")
+        # never returns -1 and the loop would spin forever
+        return list(entries)
+    hits = []
+    pos = blob.find(query_lower)
+    while pos != -1:
+        # Map the hit offset back to its row; the NUL separator guarantees
+        # a match never spans two messages.
+        i = bisect_right(starts, pos) - 1
+        hits.append(entries[i])
+        # Resume after this row so each entry is reported at most once
+        next_start = starts[i + 1] if i + 1 < len(starts) else len(blob)
+        pos = blob.find(query_lower, next_start)
+    return hits
+
+
+@_tool_result
+def search_entries(query: str, categories: Optional[List[str]] = None, limit: int = 10) -> Dict:
+    """Search for entries matching query using semantic search + keyword fallback."""
+    if len(query) > MAX_MSG_LEN:
         return {
             "success": False,
-            "error": str(e)
+            "error": f"Query too long ({len(query)} chars, max {MAX_MSG_LEN})"
         }
 
+    if categories is None:
+        categories = CATEGORIES + ["inbox"]
 
-def get_entry(entry_id: str) -> Dict:
-    """Get a specific entry by ID."""
-    try:
-        result = get_entry_by_id(entry_id)
-        if result:
-            entry, category = result
-            return {
-                "success": True,
-                "entry": entry,
-                "category": category
-            }
+    # UUID-shaped queries are direct lookups; skip the whole pipeline
+    if len(query) == 36 and query.count("-") == 4:
+        try:
+            uuid.UUID(query)
+        except ValueError:
+            pass
         else:
+            result = get_entry_by_id(query)
+            entries = []
+            if result:
+                entry, category = result
+                entries.append({**entry, "_category": category, "_search_method": "id"})
             return {
-                "success": False,
-                "error": "Entry not found"
+                "success": True,
+                "query": query,
+                "count": len(entries),
+                "entries": entries,
+                "search_method": "id",
+                "embedding_stats": None
             }
-    except Exception as e:
+
+    # Try semantic search first
+    _ensure_embeddings()
+
+    stats = _get_embedding_stats()
+    use_semantic = stats.get("total", 0) > 0
+
+    semantic_results = []
+    if use_semantic:
+        # Get semantic matches with similarity scores
+        semantic_matches = _semantic_search(query, categories, limit * 2)
+
+        # Fetch full entries for semantic matches in one batch read
+        # (one pass over the store instead of a lookup per ID)
+        hydrated = get_entries_by_ids([m[0] for m in semantic_matches])
+        for entry_id, similarity in semantic_matches:
+            result = hydrated.get(entry_id)
+            if result:
+                entry, category = result
+                # One dict construction instead of copy() + three setitems
+                semantic_results.append({
+                    **entry,
+                    "_category": category,
+                    "_similarity": similarity,
+                    "_search_method": "semantic",
+                })
+
+    # Semantic hits already fill the page: the keyword sweep's results
+    # would all be sliced away, so skip it entirely
+    if len(semantic_results) >= limit:
         return {
-            "success": False,
-            "error": str(e)
+            "success": True,
+            "query": query,
+            "count": len(semantic_results),
+            "entries": semantic_results[:limit],
+            "search_method": "semantic",
+            "embedding_stats": stats
         }
 
-
-def create_entry(category: str, message: str, confidence: float, chat_id: int = None, message_id: int = None) -> Dict:
-    """Create a new entry."""
-    try:
-        # Low confidence goes to inbox
-        if confidence < CONFIDENCE_THRESHOLD:
-            category = "inbox"
-
-        entry = storage_create_entry(
-            category=category,
-            raw_message=message,
-            confidence=confidence,
-            chat_id=chat_id,
-            message_id=message_id
+    # Also do keyword search for completeness. Matches are collected as
+    # (timestamp, category, entry) tuples; the annotated dict copies are
+    # only built for the rows that survive the final limit cut.
+    query_lower = query.lower()
+    keyword_matches = []
+    seen_ids = {r.get("id") for r in semantic_results}
+
+    # Prefer the FTS5 trigram index (O(matches) instead of a full scan);
+    # trigrams need at least 3 chars, shorter queries use the scan below.
+    fts_hits = None
+    if len(query) >= 3:
+        try:
+            import search_index
+            if search_index.refresh_index():
+                fts_hits = search_index.search(query, categories, limit * 2)
+        except Exception as e:
+            logger.warning(f"FTS search failed, falling back to scan: {e}")
+            fts_hits = None
+
+    if fts_hits is not None:
+        hydrated = get_entries_by_ids([h[0] for h in fts_hits])
+        # Skip hits already present in the semantic results
+        keyword_matches.extend(
+            (hydrated[entry_id][0].get("timestamp", ""), category, hydrated[entry_id][0])
+            for entry_id, category in fts_hits
+            if entry_id not in seen_ids and entry_id in hydrated
         )
+    else:
+        threshold = None  # limit-th newest keyword timestamp collected so far
+        for category in categories:
+            entries, _, _, newest = _scan_rows(category)
+            if not entries:
+                continue
+            # Once `limit` hits are in hand, a category whose newest entry
+            # is older than all of them cannot change the returned page
+            if threshold is not None and newest <= threshold:
+                continue
+            # Skip hits already present in the semantic results
+            keyword_matches.extend(
+                (entry.get("timestamp", ""), category, entry)
+                for entry in _scan_category(category, query_lower)
+                if entry.get("id") not in seen_ids
+            )
+            if len(keyword_matches) >= limit:
+                threshold = heapq.nlargest(limit, keyword_matches, key=itemgetter(0))[-1][0]
+
+    # Combine results: semantic first (sorted by similarity), then keyword
+    # (newest first). Only the top `keep` are needed, so nlargest does
+    # O(M log keep) work instead of sorting the whole match list.
+    keep = max(limit - len(semantic_results), 0)
+    keyword_entries = [
+        {**entry, "_category": category, "_search_method": "keyword"}
+        for _, category, entry in heapq.nlargest(keep, keyword_matches, key=itemgetter(0))
+    ]
+
+    return {
+        "success": True,
+        "query": query,
+        "count": len(semantic_results) + len(keyword_matches),
+        "entries": (semantic_results + keyword_entries)[:limit],
+        "search_method": "semantic+keyword" if use_semantic else "keyword",
+        "embedding_stats": stats if use_semantic else None
+    }
 
-        log_audit("classified", entry["id"], category, confidence)
-
-        # Enrich context for high-confidence entries
-        if category != "inbox" and confidence >= CONFIDENCE_THRESHOLD:
-            try:
-                from context_manager import enrich_context
-                enrich_context(category, entry)
-            except:
-                pass
 
+@_tool_result
+def get_entry(entry_id: str) -> Dict:
+    """Get a specific entry by ID."""
+    result = get_entry_by_id(entry_id)
+    if result:
+        entry, category = result
         return {
             "success": True,
             "entry": entry,
             "category": category
         }
-    except Exception as e:
+    else:
         return {
             "success": False,
-            "error": str(e)
+            "error": "Entry not found"
         }
 
 
+# Lazily bound like the embeddings helpers above: the first enrichment
+# pays the context_manager import once instead of per create_entry call.
+_enrich_context = None
+
+
+def _ensure_enrich():
+    global _enrich_context
+    if _enrich_context is None:
+        from context_manager import enrich_context
+        _enrich_context = enrich_context
+
+
+@_tool_result
+def create_entry(category: str, message: str, confidence: float, chat_id: int = None, message_id: int = None) -> Dict:
+    """Create a new entry."""
+    if category not in _VALID_CATEGORIES:
+        return {"success": False, "error": f"Unknown category: {category}"}
+
+    if len(message) > MAX_MSG_LEN:
+        return {
+            "success": False,
+            "error": f"Message too long ({len(message)} chars, max {MAX_MSG_LEN})"
+        }
+
+    # Low confidence goes to inbox
+    if confidence < CONFIDENCE_THRESHOLD:
+        category = "inbox"
+
+    entry = storage_create_entry(
+        category=category,
+        raw_message=message,
+        confidence=confidence,
+        chat_id=chat_id,
+        message_id=message_id
+    )
+
+    log_audit("classified", entry["id"], category, confidence)
+
+    # Enrich context for high-confidence entries
+    if category != "inbox" and confidence >= CONFIDENCE_THRESHOLD:
+        try:
+            _ensure_enrich()
+            _enrich_context(category, entry)
+        except Exception as e:
+            # Enrichment is best-effort; the entry is already stored
+            logger.warning(f"Context enrichment failed: {e}")
+
+    return {
+        "success": True,
+        "entry": entry,
+        "category": category
+    }
+
+
+@_tool_result
 def move_entry(entry_id: str, from_category: str, to_category: str) -> Dict:
     """Move entry between categories."""
-    try:
-        moved = storage_move_entry(entry_id, from_category, to_category)
-        if moved:
-            log_audit("corrected", entry_id, to_category,
-                     details={"from_category": from_category})
-            return {
-                "success": True,
-                "entry": moved,
-                "from_category": from_category,
-                "to_category": to_category
-            }
-        else:
-            return {
-                "success": False,
-                "error": "Failed to move entry"
-            }
-    except Exception as e:
+    if from_category not in _VALID_CATEGORIES or to_category not in _VALID_CATEGORIES:
+        return {"success": False, "error": f"Unknown category: {from_category} -> {to_category}"}
+
+    moved = storage_move_entry(entry_id, from_category, to_category)
+    if moved:
+        log_audit("corrected", entry_id, to_category,
+                 details={"from_category": from_category})
+        return {
+            "success": True,
+            "entry": moved,
+            "from_category": from_category,
+            "to_category": to_category
+        }
+    else:
         return {
             "success": False,
-            "error": str(e)
+            "error": "Failed to move entry"
         }
 
 
+@_tool_result
 def delete_entry(entry_id: str, category: str) -> Dict:
     """Delete an entry."""
-    try:
-        deleted = storage_delete_entry(entry_id, category)
-        if deleted:
-            log_audit("deleted", entry_id, category)
-            return {
-                "success": True,
-                "entry_id": entry_id,
-                "category": category
-            }
-        else:
-            return {
-                "success": False,
-                "error": "Failed to delete entry"
-            }
-    except Exception as e:
+    if category not in _VALID_CATEGORIES:
+        return {"success": False, "error": f"Unknown category: {category}"}
+
+    deleted = storage_delete_entry(entry_id, category)
+    if deleted:
+        log_audit("deleted", entry_id, category)
+        return {
+            "success": True,
+            "entry_id": entry_id,
+            "category": category
+        }
+    else:
         return {
             "success": False,
-            "error": str(e)
+            "error": "Failed to delete entry"
         }
 
 
-def write_journal(content: str, timestamp: Optional[str] = None, linked_entries: Optional[List[str]] = None) -> Dict:
-    """Write a journal entry, then check pending reminders for auto-completion."""
-    try:
-        # Parse timestamp if provided
-        dt = None
-        if timestamp:
-            try:
-                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            except ValueError:
-                return {
-                    "success": False,
-                    "error": "Invalid timestamp format"
-                }
+# Lazily bound like the embeddings/enrichment helpers: write_journal pays
+# the diary_reminder_bridge import once instead of on every entry.
+_review_diary = None
+
 
-        result = journal_storage.write_journal(content, dt, linked_entries)
+def _ensure_bridge():
+    global _review_diary
+    if _review_diary is None:
+        from diary_reminder_bridge import review_diary_against_reminders
+        _review_diary = review_diary_against_reminders
 
-        # After writing, review diary against pending reminders
+
+@_tool_result
+def write_journal(content: str, timestamp: Optional[str] = None, linked_entries: Optional[List[str]] = None) -> Dict:
+    """Write a journal entry, then check pending reminders for auto-completion."""
+    # Parse timestamp if provided
+    dt = None
+    if timestamp:
         try:
-            from diary_reminder_bridge import review_diary_against_reminders
-            pending = reminder_storage.list_reminders(status="pending")
-            if pending:
-                bridge_result = review_diary_against_reminders(content, pending)
-
-                # Auto-complete confirmed reminders
-                auto_completed = []
-                for item in bridge_result.get("auto_complete", []):
-                    rid = item.get("reminder_id")
-                    reason = item.get("reason", "Confirmed by diary entry")
-                    if rid and reminder_storage.add_completion_note(rid, reason, auto_completed=True):
-                        auto_completed.append(item)
-
-                if auto_completed:
-                    result["auto_completed_reminders"] = auto_completed
-                relevant = bridge_result.get("relevant_mentions", [])
-                if relevant:
-                    result["relevant_reminders"] = relevant
-        except Exception as e:
-            import logging
-            logging.getLogger(__name__).warning(f"Bridge review failed: {e}")
+            dt = _parse_iso_dt(timestamp)
+        except ValueError:
+            return {
+                "success": False,
+                "error": "Invalid timestamp format"
+            }
 
-        return result
+    result = journal_storage.write_journal(content, dt, linked_entries)
 
+    # After writing, review diary against pending reminders
+    try:
+        _ensure_bridge()
+        pending = reminder_storage.list_reminders(status="pending")
+        if pending:
+            bridge_result = _review_diary(content, pending)
+
+            # Auto-complete confirmed reminders
+            auto_completed = []
+            for item in bridge_result.get("auto_complete", []):
+                rid = item.get("reminder_id")
+                reason = item.get("reason", "Confirmed by diary entry")
+                if rid and reminder_storage.add_completion_note(rid, reason, auto_completed=True):
+                    auto_completed.append(item)
+
+            if auto_completed:
+                result["auto_completed_reminders"] = auto_completed
+            relevant = bridge_result.get("relevant_mentions", [])
+            if relevant:
+                result["relevant_reminders"] = relevant
     except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+        logger.warning(f"Bridge review failed: {e}")
 
+    return result
 
+
+@_tool_result
 def read_journal(date_str: Optional[str] = None) -> Dict:
     """Read a journal entry for a date."""
-    try:
-        # Parse date if provided
-        target_date = None
-        if date_str:
-            try:
-                target_date = date.fromisoformat(date_str)
-            except ValueError:
-                return {
-                    "success": False,
-                    "error": "Invalid date format. Use YYYY-MM-DD"
-                }
-
-        result = journal_storage.read_journal(target_date)
-        result["success"] = True
-        return result
+    # Parse date if provided
+    target_date = None
+    if date_str:
+        try:
+            target_date = date.fromisoformat(date_str)
+        except ValueError:
+            return {
+                "success": False,
+                "error": "Invalid date format. Use YYYY-MM-DD"
+            }
 
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    result = journal_storage.read_journal(target_date)
+    result["success"] = True
+    return result
 
 
+@_tool_result
 def search_journal(query: str, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Dict:
     """Search journal entries."""
-    try:
-        # Parse dates if provided
-        from_date = None
-        to_date = None
+    # Parse dates if provided
+    from_date = None
+    to_date = None
 
-        if date_from:
-            try:
-                from_date = date.fromisoformat(date_from)
-            except ValueError:
-                return {
-                    "success": False,
-                    "error": "Invalid date_from format. Use YYYY-MM-DD"
-                }
-
-        if date_to:
-            try:
-                to_date = date.fromisoformat(date_to)
-            except ValueError:
-                return {
-                    "success": False,
-                    "error": "Invalid date_to format. Use YYYY-MM-DD"
-                }
+    if date_from:
+        try:
+            from_date = date.fromisoformat(date_from)
+        except ValueError:
+            return {
+                "success": False,
+                "error": "Invalid date_from format. Use YYYY-MM-DD"
+            }
 
-        matches = journal_storage.search_journal(query, from_date, to_date)
+    if date_to:
+        try:
+            to_date = date.fromisoformat(date_to)
+        except ValueError:
+            return {
+                "success": False,
+                "error": "Invalid date_to format. Use YYYY-MM-DD"
+            }
 
-        return {
-            "success": True,
-            "query": query,
-            "count": len(matches),
-            "matches": matches
-        }
+    matches = journal_storage.search_journal(query, from_date, to_date)
 
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    return {
+        "success": True,
+        "query": query,
+        "count": len(matches),
+        "matches": matches
+    }
 
 
+@_tool_result
 def create_reminder(
     content: str,
     trigger_time: Optional[str] = None,
@@ -887,437 +1113,552 @@ def create_reminder(
     journal_date: Optional[str] = None
 ) -> Dict:
     """Create a reminder."""
-    try:
-        # Parse trigger_time if provided
-        dt = None
-        if trigger_time:
-            try:
-                dt = datetime.fromisoformat(trigger_time.replace('Z', '+00:00'))
-            except ValueError:
-                return {
-                    "success": False,
-                    "error": "Invalid trigger_time format"
-                }
-
-        # Parse journal_date if provided
-        j_date = None
-        if journal_date:
-            try:
-                j_date = date.fromisoformat(journal_date)
-            except ValueError:
-                return {
-                    "success": False,
-                    "error": "Invalid journal_date format"
-                }
-
-        reminder = reminder_storage.create_reminder(
-            content=content,
-            trigger_time=dt,
-            repeat=repeat,
-            reference_entry_id=reference_entry_id,
-            journal_date=j_date
-        )
+    # Parse trigger_time if provided
+    dt = None
+    if trigger_time:
+        try:
+            dt = _parse_iso_dt(trigger_time)
+        except ValueError:
+            return {
+                "success": False,
+                "error": "Invalid trigger_time format"
+            }
 
-        return {
-            "success": True,
-            "reminder": reminder
-        }
+    # Parse journal_date if provided
+    j_date = None
+    if journal_date:
+        try:
+            j_date = date.fromisoformat(journal_date)
+        except ValueError:
+            return {
+                "success": False,
+                "error": "Invalid journal_date format"
+            }
 
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    reminder = reminder_storage.create_reminder(
+        content=content,
+        trigger_time=dt,
+        repeat=repeat,
+        reference_entry_id=reference_entry_id,
+        journal_date=j_date
+    )
+
+    return {
+        "success": True,
+        "reminder": reminder
+    }
 
 
+@_tool_result
 def list_reminders(status: Optional[str] = None) -> Dict:
     """List reminders."""
-    try:
-        reminders = reminder_storage.list_reminders(status)
+    reminders = reminder_storage.list_reminders(status)
 
-        return {
-            "success": True,
-            "count": len(reminders),
-            "reminders": reminders
-        }
-
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    return {
+        "success": True,
+        "count": len(reminders),
+        "reminders": reminders
+    }
 
 
+@_tool_result
 def complete_reminder_tool(reminder_id: str, note: Optional[str] = None) -> Dict:
     """Mark a reminder as completed."""
-    try:
-        if note:
-            success = reminder_storage.add_completion_note(reminder_id, note)
-        else:
-            success = reminder_storage.complete_reminder(reminder_id)
+    if note:
+        success = reminder_storage.add_completion_note(reminder_id, note)
+    else:
+        success = reminder_storage.complete_reminder(reminder_id)
 
-        if success:
-            return {
-                "success": True,
-                "reminder_id": reminder_id,
-                "note": note
-            }
-        else:
-            return {
-                "success": False,
-                "error": "Reminder not found"
-            }
-    except Exception as e:
+    if success:
+        return {
+            "success": True,
+            "reminder_id": reminder_id,
+            "note": note
+        }
+    else:
         return {
             "success": False,
-            "error": str(e)
+            "error": "Reminder not found"
         }
 
 
+@_tool_result
 def link_entries(journal_date: str, entry_id: str, link_type: str) -> Dict:
     """Link a journal entry to a knowledge entry."""
+    # Parse journal_date
     try:
-        # Parse journal_date
-        try:
-            j_date = date.fromisoformat(journal_date)
-        except ValueError:
-            return {
-                "success": False,
-                "error": "Invalid journal_date format. Use YYYY-MM-DD"
-            }
-
-        # Add link to journal file
-        journal_linked = journal_storage.add_linked_entry_to_journal(j_date, entry_id)
-
-        if not journal_linked:
-            return {
-                "success": False,
-                "error": "Journal entry not found or failed to update"
-            }
-
-        # Add journal ref to knowledge entry
-        entry_linked = add_journal_ref_to_entry(entry_id, journal_date, link_type)
+        j_date = date.fromisoformat(journal_date)
+    except ValueError:
+        return {
+            "success": False,
+            "error": "Invalid journal_date format. Use YYYY-MM-DD"
+        }
 
-        if not entry_linked:
-            return {
-                "success": False,
-                "error": "Knowledge entry not found or failed to update"
-            }
+    # Add link to journal file
+    journal_linked = journal_storage.add_linked_entry_to_journal(j_date, entry_id)
 
+    if not journal_linked:
         return {
-            "success": True,
-            "journal_date": journal_date,
-            "entry_id": entry_id,
-            "link_type": link_type
+            "success": False,
+            "error": "Journal entry not found or failed to update"
         }
 
-    except Exception as e:
+    # Add journal ref to knowledge entry
+    entry_linked = add_journal_ref_to_entry(entry_id, journal_date, link_type)
+
+    if not entry_linked:
         return {
             "success": False,
-            "error": str(e)
+            "error": "Knowledge entry not found or failed to update"
         }
 
+    return {
+        "success": True,
+        "journal_date": journal_date,
+        "entry_id": entry_id,
+        "link_type": link_type
+    }
 
-def get_audio_file(date_str: str, index: int) -> Dict:
-    """Get path to audio file for a date."""
-    try:
-        # Parse date
-        try:
-            target_date = date.fromisoformat(date_str)
-        except ValueError:
-            return {
-                "success": False,
-                "error": "Invalid date format. Use YYYY-MM-DD"
-            }
 
-        # Build audio file path
-        year = str(target_date.year)
-        month = f"{target_date.month:02d}"
+# Cached per-day audio listings keyed on the directory's mtime, so asking
+# for several recordings of the same date only scans the directory once.
+_AUDIO_INDEX: "OrderedDict[tuple, tuple]" = OrderedDict()
+_AUDIO_INDEX_MAX = 128
 
-        audio_dir = JOURNAL_AUDIO_DIR / year / month
-        if not audio_dir.exists():
-            return {
-                "success": False,
-                "error": "No audio files for this date"
-            }
 
-        # List audio files for this date
-        day = f"{target_date.day:02d}"
-        audio_files = sorted(audio_dir.glob(f"{day}_*.ogg"))
+@_tool_result
+def get_audio_file(date_str: str, index: int) -> Dict:
+    """Get path to audio file for a date."""
+    # Parse date
+    try:
+        target_date = date.fromisoformat(date_str)
+    except ValueError:
+        return {
+            "success": False,
+            "error": "Invalid date format. Use YYYY-MM-DD"
+        }
 
-        if index >= len(audio_files):
-            return {
-                "success": False,
-                "error": f"Audio index {index} not found. Only {len(audio_files)} files exist."
-            }
+    # Build audio file path
+    year = str(target_date.year)
+    month = f"{target_date.month:02d}"
 
+    audio_dir = JOURNAL_AUDIO_DIR / year / month
+    if not audio_dir.exists():
         return {
-            "success": True,
-            "date": date_str,
-            "index": index,
-            "file_path": str(audio_files[index])
+            "success": False,
+            "error": "No audio files for this date"
         }
 
-    except Exception as e:
+    # List audio files for this date, reusing the cached listing when
+    # the directory hasn't changed
+    day = f"{target_date.day:02d}"
+    dir_mtime = audio_dir.stat().st_mtime_ns
+    key = (year, month, day)
+    cached = _AUDIO_INDEX.get(key)
+    if cached is not None and cached[0] == dir_mtime:
+        audio_files = cached[1]
+        _AUDIO_INDEX.move_to_end(key)
+    else:
+        prefix = f"{day}_"
+        with os.scandir(audio_dir) as it:
+            audio_files = [
+                entry.path
+                for entry in it
+                if entry.name.startswith(prefix) and entry.name.endswith(".ogg")
+            ]
+        audio_files.sort()
+        _AUDIO_INDEX[key] = (dir_mtime, audio_files)
+        _AUDIO_INDEX.move_to_end(key)
+        while len(_AUDIO_INDEX) > _AUDIO_INDEX_MAX:
+            _AUDIO_INDEX.popitem(last=False)
+
+    if index >= len(audio_files):
         return {
             "success": False,
-            "error": str(e)
+            "error": f"Audio index {index} not found. Only {len(audio_files)} files exist."
         }
 
+    return {
+        "success": True,
+        "date": date_str,
+        "index": index,
+        "file_path": audio_files[index]
+    }
 
-def list_files(path: str = ".", max_depth: int = 3, include_hidden: bool = False, max_entries: int = 200) -> Dict:
-    """List files in the repository."""
-    try:
-        root = _resolve_repo_path(path)
-        if not root.exists():
-            return {"success": False, "error": "Path not found"}
 
-        results: List[str] = []
-        base_parts = len(root.parts)
+# Directories never worth descending into, mirroring ripgrep's defaults:
+# .git alone holds one object file per commit, and virtualenvs dwarf the
+# working tree. Hidden-name filtering already skips most of these, but
+# only when include_hidden is off.
+_PRUNE_DIRS = frozenset({
+    ".git", "node_modules", "__pycache__", ".venv", "venv",
+    ".mypy_cache", ".pytest_cache", "dist", "build",
+})
 
-        for dirpath, dirnames, filenames in os.walk(root):
-            current_depth = len(Path(dirpath).parts) - base_parts
-            if current_depth >= max_depth:
-                dirnames[:] = []
 
-            if not include_hidden:
-                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
-                filenames = [f for f in filenames if not f.startswith(".")]
+@_tool_result
+def list_files(path: str = ".", max_depth: int = 3, include_hidden: bool = False, max_entries: int = 200) -> Dict:
+    """List files in the repository."""
+    root = _resolve_repo_path(path)
+    if not root.exists():
+        return {"success": False, "error": "Path not found"}
 
-            for filename in filenames:
-                rel = Path(dirpath) / filename
-                try:
-                    rel_path = rel.resolve().relative_to(BASE_DIR.resolve())
-                except Exception:
-                    rel_path = rel
-                results.append(str(rel_path))
-                if len(results) >= max_entries:
-                    return {
-                        "success": True,
-                        "path": str(root),
-                        "count": len(results),
-                        "truncated": True,
-                        "files": results,
-                    }
+    results: List[str] = []
+    base = str(_BASE_RESOLVED)
 
-        return {
-            "success": True,
-            "path": str(root),
-            "count": len(results),
-            "files": results,
-        }
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    def _walk(dir_path: str, depth: int) -> bool:
+        """Collect files under dir_path; returns False once max_entries is hit."""
+        try:
+            it = os.scandir(dir_path)
+        except OSError:
+            return True
+        subdirs = []
+        with it:
+            for entry in it:
+                if not include_hidden and entry.name.startswith("."):
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    if entry.name in _PRUNE_DIRS:
+                        continue
+                    subdirs.append(entry.path)
+                else:
+                    # DirEntry.path is already absolute under root; a string
+                    # relpath avoids the per-file realpath() the old walker paid
+                    results.append(os.path.relpath(entry.path, base))
+                    if len(results) >= max_entries:
+                        return False
+        if depth < max_depth:
+            for sub in subdirs:
+                if not _walk(sub, depth + 1):
+                    return False
+        return True
+
+    completed = _walk(str(root), 0)
+
+    result = {
+        "success": True,
+        "path": str(root),
+        "count": len(results),
+        "files": results,
+    }
+    if not completed:
+        result["truncated"] = True
+    return result
 
 
+@_tool_result
 def read_file(path: str, max_bytes: int = 200000) -> Dict:
     """Read a text file from the repository."""
-    try:
-        file_path = _resolve_repo_path(path)
-        if not file_path.exists() or not file_path.is_file():
-            return {"success": False, "error": "File not found"}
+    file_path = _resolve_repo_path(path)
+    if not file_path.exists() or not file_path.is_file():
+        return {"success": False, "error": "File not found"}
 
-        content = file_path.read_text(encoding="utf-8")
-        if len(content.encode("utf-8")) > max_bytes:
-            truncated = content.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore")
-            return {"success": True, "path": str(file_path), "truncated": True, "content": truncated}
+    # Read at most max_bytes (+1 to detect truncation) instead of pulling
+    # the whole file into memory and re-encoding it to measure its size
+    with file_path.open("rb") as f:
+        data = f.read(max_bytes + 1)
 
-        return {"success": True, "path": str(file_path), "content": content}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    if len(data) > max_bytes:
+        truncated = data[:max_bytes].decode("utf-8", errors="ignore")
+        return {"success": True, "path": str(file_path), "truncated": True, "content": truncated}
+
+    return {"success": True, "path": str(file_path), "content": data.decode("utf-8")}
 
 
+# Parent directories already mkdir'd this process; repeat writes into the
+# same directory skip the ancestor stat/mkdir walk entirely. Cleared
+# wholesale if it somehow grows past any plausible repo size.
+_ENSURED_DIRS: set = set()
+_ENSURED_DIRS_MAX = 4096
+
+
+@_tool_result
 def write_file(path: str, content: str, create_dirs: bool = True) -> Dict:
     """Write a text file to the repository."""
+    file_path = _resolve_repo_path(path)
+    parent = str(file_path.parent)
+    if create_dirs and parent not in _ENSURED_DIRS:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        if len(_ENSURED_DIRS) >= _ENSURED_DIRS_MAX:
+            _ENSURED_DIRS.clear()
+        _ENSURED_DIRS.add(parent)
     try:
-        file_path = _resolve_repo_path(path)
-        if create_dirs:
-            file_path.parent.mkdir(parents=True, exist_ok=True)
         file_path.write_text(content, encoding="utf-8")
-        return {"success": True, "path": str(file_path), "bytes": len(content.encode("utf-8"))}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    except FileNotFoundError:
+        # Directory vanished since we cached it (external cleanup);
+        # recreate and retry once
+        _ENSURED_DIRS.discard(parent)
+        if not create_dirs:
+            raise
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        _ENSURED_DIRS.add(parent)
+        file_path.write_text(content, encoding="utf-8")
+    return {"success": True, "path": str(file_path), "bytes": len(content.encode("utf-8"))}
 
 
-def search_repo(query: str, path: str = ".", max_results: int = 20) -> Dict:
-    """Search the repository for a query."""
+def _scan_file_matches(file_path: Path, query_bytes: bytes, remaining: int) -> list:
+    """
+    Byte-level scan of one file via mmap; only lines containing a hit are
+    decoded. Returns up to `remaining` (line_number, text) pairs.
+    """
+    hits: list = []
     try:
-        root = _resolve_repo_path(path)
-        if not root.exists():
-            return {"success": False, "error": "Path not found"}
-
-        rg = shutil.which("rg")
-        matches: List[Dict] = []
-
-        if rg:
-            result = subprocess.run(
-                [rg, "-n", "--max-count", str(max_results), query, str(root)],
-                cwd=str(BASE_DIR),
-                capture_output=True,
-                text=True,
-                check=False,
-            )
-            if result.returncode not in (0, 1):
-                return {"success": False, "error": result.stderr.strip() or "rg failed"}
-
-            for line in result.stdout.splitlines():
-                parts = line.split(":", 2)
-                if len(parts) < 3:
-                    continue
-                file_path, line_no, text = parts
-                try:
-                    rel_path = Path(file_path).resolve().relative_to(BASE_DIR.resolve())
-                except Exception:
-                    rel_path = Path(file_path)
-                matches.append({"file": str(rel_path), "line": int(line_no), "text": text})
-                if len(matches) >= max_results:
-                    break
-        else:
-            for file_path in root.rglob("*"):
-                if len(matches) >= max_results:
-                    break
-                if not file_path.is_file():
-                    continue
-                try:
-                    content = file_path.read_text(encoding="utf-8")
-                except Exception:
-                    continue
-                for i, line in enumerate(content.splitlines(), start=1):
-                    if query in line:
-                        try:
-                            rel_path = file_path.resolve().relative_to(BASE_DIR.resolve())
-                        except Exception:
-                            rel_path = file_path
-                        matches.append({"file": str(rel_path), "line": i, "text": line})
-                        if len(matches) >= max_results:
-                            break
-
-        return {"success": True, "query": query, "count": len(matches), "matches": matches}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
-
-
-def git_status() -> Dict:
-    """Return git status output."""
-    try:
-        result = subprocess.run(
-            ["git", "status", "-sb"],
+        with open(file_path, "rb") as fh:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Binary-file heuristic: NUL byte in the first 8KB
+                if mm.find(b"\x00", 0, 8192) != -1:
+                    return hits
+                line_no = 1
+                counted_to = 0
+                idx = mm.find(query_bytes)
+                while idx != -1 and len(hits) < remaining:
+                    line_start = mm.rfind(b"\n", 0, idx) + 1
+                    line_end = mm.find(b"\n", idx)
+                    if line_end == -1:
+                        line_end = len(mm)
+                    # mmap has find/rfind but no count; step through the
+                    # newlines between the last counted point and this line
+                    nl = mm.find(b"\n", counted_to, line_start)
+                    while nl != -1:
+                        line_no += 1
+                        nl = mm.find(b"\n", nl + 1, line_start)
+                    counted_to = line_start
+                    text = mm[line_start:line_end].decode("utf-8", errors="replace")
+                    hits.append((line_no, text))
+                    idx = mm.find(query_bytes, line_end + 1)
+    except (OSError, ValueError):
+        # Unreadable or empty file (mmap rejects zero-length maps)
+        pass
+    return hits
+
+
+@_tool_result
+def search_repo(query: str, path: str = ".", max_results: int = 20, file_type: Optional[str] = None) -> Dict:
+    """Search the repository for a query."""
+    root = _resolve_repo_path(path)
+    if not root.exists():
+        return {"success": False, "error": "Path not found"}
+
+    rg = _RG_PATH
+    matches: List[Dict] = []
+
+    if rg:
+        # Flags shared by both passes: cap pathological long lines
+        # (minified JS, lockfiles) instead of feeding them through the
+        # regex engine and printer, silence permission-error noise, and
+        # optionally restrict to one of rg's built-in file types.
+        common_flags = ["--max-columns=200", "--max-columns-preview", "--no-messages"]
+        if file_type:
+            common_flags.append(f"--type={file_type}")
+
+        # Phase 1: file-level prune. -l stops at the first match per file
+        # and skips all line formatting, so sparse queries over a big tree
+        # don't pay for output that max_results would truncate anyway.
+        targets = [str(root)]
+        probe = subprocess.run(
+            [rg, "-l", "-0", "--max-count", "1", *common_flags, query, str(root)],
             cwd=str(BASE_DIR),
             capture_output=True,
             text=True,
             check=False,
         )
-        return {"success": result.returncode == 0, "output": result.stdout.strip(), "error": result.stderr.strip()}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
-
-
-def git_diff(staged: bool = False, path: Optional[str] = None) -> Dict:
-    """Return git diff output."""
-    try:
-        cmd = ["git", "diff"]
-        if staged:
-            cmd.append("--staged")
-        if path:
-            cmd.extend(["--", path])
-        result = subprocess.run(
-            cmd,
+        if probe.returncode == 1:
+            return {"success": True, "query": query, "count": 0, "matches": []}
+        if probe.returncode == 0:
+            files = [f for f in probe.stdout.split("\0") if f]
+            if files and len(files) <= 64:
+                targets = files
+        else:
+            # Bad pattern, unreadable root, etc. - the match pass would
+            # fail the same way, so surface the probe's error directly
+            return {"success": False, "error": probe.stderr.strip() or "rg failed"}
+
+        # Phase 2: full match pass over the pruned candidate set. --json
+        # gives structured events, so paths containing ':' can't confuse
+        # the parser the way file:line:text splitting could. Streaming
+        # through Popen keeps memory at O(max_results) and lets us stop
+        # rg as soon as the page is full instead of buffering everything.
+        proc = subprocess.Popen(
+            [rg, "--json", "--line-buffered", "--max-count", str(max_results), *common_flags, query, *targets],
             cwd=str(BASE_DIR),
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
             text=True,
-            check=False,
         )
-        return {"success": result.returncode == 0, "output": result.stdout, "error": result.stderr.strip()}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+        try:
+            for line in proc.stdout:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if event.get("type") != "match":
+                    continue
+                data = event["data"]
+                file_path = data.get("path", {}).get("text", "")
+                matches.append({
+                    "file": _rel_to_base(file_path),
+                    "line": data.get("line_number"),
+                    "text": data.get("lines", {}).get("text", "").rstrip("\n"),
+                })
+                if len(matches) >= max_results:
+                    break
+        finally:
+            proc.stdout.close()
+            proc.terminate()
+            try:
+                proc.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+    else:
+        query_bytes = query.encode("utf-8")
+        for file_path in root.rglob("*"):
+            if len(matches) >= max_results:
+                break
+            if not file_path.is_file():
+                continue
+            rel_path = _rel_to_base(str(file_path))
+            for line_no, text in _scan_file_matches(file_path, query_bytes, max_results - len(matches)):
+                matches.append({"file": rel_path, "line": line_no, "text": text})
+
+    return {"success": True, "query": query, "count": len(matches), "matches": matches}
+
 
+# Read-only git calls skip the optional index refresh write; without it,
+# `status`/`diff` take the index lock and rewrite .git/index on every call.
+_GIT_READONLY_ENV = {**os.environ, "GIT_OPTIONAL_LOCKS": "0"}
 
+
+@_tool_result
+def git_status() -> Dict:
+    """Return git status output."""
+    result = subprocess.run(
+        [_GIT_PATH, "status", "-sb"],
+        cwd=str(BASE_DIR),
+        env=_GIT_READONLY_ENV,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return {"success": result.returncode == 0, "output": result.stdout.strip(), "error": result.stderr.strip()}
+
+
+@_tool_result
+def git_diff(staged: bool = False, path: Optional[str] = None) -> Dict:
+    """Return git diff output."""
+    cmd = [_GIT_PATH, "diff"]
+    if staged:
+        cmd.append("--staged")
+    if path:
+        cmd.extend(["--", path])
+    result = subprocess.run(
+        cmd,
+        cwd=str(BASE_DIR),
+        env=_GIT_READONLY_ENV,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return {"success": result.returncode == 0, "output": result.stdout, "error": result.stderr.strip()}
+
+
+@_tool_result
 def publish_changes(message: Optional[str] = None) -> Dict:
     """Stage, commit, and push changes."""
-    try:
-        subprocess.run(["git", "add", "-A"], cwd=str(BASE_DIR), check=False)
-
-        status = subprocess.run(
-            ["git", "status", "--porcelain"],
-            cwd=str(BASE_DIR),
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        if not status.stdout.strip():
+    subprocess.run([_GIT_PATH, "add", "-A"], cwd=str(BASE_DIR), check=False)
+
+    commit_message = message or "Update via Telegram admin"
+    commit = subprocess.run(
+        [_GIT_PATH, "commit", "-m", commit_message],
+        cwd=str(BASE_DIR),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if commit.returncode != 0:
+        # A clean tree isn't an error: git reports it on stdout with a
+        # non-zero exit, which saves the separate `status --porcelain` probe.
+        if "nothing to commit" in commit.stdout:
             return {"success": True, "status": "clean", "message": "No changes to commit"}
+        return {"success": False, "error": commit.stderr.strip() or commit.stdout.strip()}
+
+    push = subprocess.run(
+        [_GIT_PATH, "push"],
+        cwd=str(BASE_DIR),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if push.returncode != 0:
+        return {"success": False, "error": push.stderr.strip() or push.stdout.strip()}
+
+    return {"success": True, "commit": commit.stdout.strip(), "push": push.stdout.strip()}
 
-        commit_message = message or "Update via Telegram admin"
-        commit = subprocess.run(
-            ["git", "commit", "-m", commit_message],
-            cwd=str(BASE_DIR),
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        if commit.returncode != 0:
-            return {"success": False, "error": commit.stderr.strip() or commit.stdout.strip()}
 
-        push = subprocess.run(
-            ["git", "push"],
+@_tool_result
+def restart_service(service_name: str = "second-brain-bot.service") -> Dict:
+    """Restart systemd service."""
+    cmds = [
+        ["systemctl", "restart", service_name],
+        ["sudo", "-n", "systemctl", "restart", service_name],
+    ]
+    last_error = ""
+    for cmd in cmds:
+        result = subprocess.run(
+            cmd,
             cwd=str(BASE_DIR),
             capture_output=True,
             text=True,
             check=False,
         )
-        if push.returncode != 0:
-            return {"success": False, "error": push.stderr.strip() or push.stdout.strip()}
-
-        return {"success": True, "commit": commit.stdout.strip(), "push": push.stdout.strip()}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+        if result.returncode == 0:
+            return {"success": True, "service": service_name, "used": " ".join(cmd)}
+        last_error = result.stderr.strip() or result.stdout.strip()
 
-
-def restart_service(service_name: str = "second-brain-bot.service") -> Dict:
-    """Restart systemd service."""
-    try:
-        cmds = [
-            ["systemctl", "restart", service_name],
-            ["sudo", "-n", "systemctl", "restart", service_name],
-        ]
-        last_error = ""
-        for cmd in cmds:
-            result = subprocess.run(
-                cmd,
-                cwd=str(BASE_DIR),
-                capture_output=True,
-                text=True,
-                check=False,
-            )
-            if result.returncode == 0:
-                return {"success": True, "service": service_name, "used": " ".join(cmd)}
-            last_error = result.stderr.strip() or result.stdout.strip()
-
-        return {"success": False, "error": last_error or "Failed to restart service"}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    return {"success": False, "error": last_error or "Failed to restart service"}
 
 
+@_tool_result
 def tail_log(lines: int = 50) -> Dict:
     """Tail the bot log file."""
-    try:
-        if not LOG_FILE.exists():
-            return {"success": False, "error": "Log file not found"}
+    if not LOG_FILE.exists():
+        return {"success": False, "error": "Log file not found"}
+
+    if lines <= 0:
         content = LOG_FILE.read_text(encoding="utf-8", errors="ignore")
         all_lines = content.splitlines()
-        tail_lines = all_lines[-lines:] if lines > 0 else all_lines
-        return {"success": True, "lines": len(tail_lines), "content": "\n".join(tail_lines)}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
-
-
+        return {"success": True, "lines": len(all_lines), "content": "\n".join(all_lines)}
+
+    # Read backwards in blocks until enough newlines are seen, so tailing
+    # a large log doesn't load the whole file
+    block_size = 64 * 1024
+    blocks = []
+    with LOG_FILE.open("rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        newlines = 0
+        while pos > 0 and newlines <= lines:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step)
+            blocks.append(block)
+            newlines += block.count(b"\n")
+
+    data = b"".join(reversed(blocks))
+    tail_lines = data.decode("utf-8", errors="ignore").splitlines()[-lines:]
+    return {"success": True, "lines": len(tail_lines), "content": "\n".join(tail_lines)}
+
+
+@_tool_result
 def list_skills_tool() -> Dict:
     """List installed skills."""
-    try:
-        skills = skills_manager.list_skills()
-        return {"success": True, "count": len(skills), "skills": skills}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    skills = skills_manager.list_skills()
+    return {"success": True, "count": len(skills), "skills": skills}
 
 
 def install_skill(name: str, repo_url: str) -> Dict:
@@ -1345,81 +1686,89 @@ def deploy_remote(message: Optional[str] = None) -> Dict:
     return deploy_manager.deploy_remote(commit_message=message)
 
 
-# Tool execution dispatcher
-def execute_tool(tool_name: str, tool_input: Dict) -> Dict:
-    """Execute a tool by name with given input."""
+# Tool dispatch table, built once at import. Tools whose signatures don't
+# line up with their schema (optional positional args, renamed functions)
+# get small adapters.
+_DISPATCH = {
     # Knowledge base tools
-    if tool_name == "list_entries":
-        return list_entries(**tool_input)
-    elif tool_name == "search_entries":
-        return search_entries(**tool_input)
-    elif tool_name == "get_entry":
-        return get_entry(**tool_input)
-    elif tool_name == "create_entry":
-        return create_entry(**tool_input)
-    elif tool_name == "move_entry":
-        return move_entry(**tool_input)
-    elif tool_name == "delete_entry":
-        return delete_entry(**tool_input)
+    "list_entries": list_entries,
+    "search_entries": search_entries,
+    "get_entry": get_entry,
+    "create_entry": create_entry,
+    "move_entry": move_entry,
+    "delete_entry": delete_entry,
     # Journal tools
-    elif tool_name == "write_journal":
-        return write_journal(**tool_input)
-    elif tool_name == "read_journal":
-        # Handle optional date parameter
-        date_str = tool_input.get("date")
-        return read_journal(date_str)
-    elif tool_name == "search_journal":
-        return search_journal(**tool_input)
+    "write_journal": write_journal,
+    "read_journal": lambda **kw: read_journal(kw.get("date")),
+    "search_journal": search_journal,
     # Reminder tools
-    elif tool_name == "create_reminder":
-        return create_reminder(**tool_input)
-    elif tool_name == "list_reminders":
-        # Handle optional status parameter
-        status = tool_input.get("status")
-        return list_reminders(status)
-    elif tool_name == "complete_reminder":
-        return complete_reminder_tool(
-            reminder_id=tool_input["reminder_id"],
-            note=tool_input.get("note")
-        )
+    "create_reminder": create_reminder,
+    "list_reminders": lambda **kw: list_reminders(kw.get("status")),
+    "complete_reminder": lambda **kw: complete_reminder_tool(
+        reminder_id=kw["reminder_id"], note=kw.get("note")
+    ),
     # Cross-reference tools
-    elif tool_name == "link_entries":
-        return link_entries(**tool_input)
-    elif tool_name == "get_audio_file":
-        return get_audio_file(**tool_input)
+    "link_entries": link_entries,
+    "get_audio_file": lambda **kw: get_audio_file(kw["date"], kw["index"]),
     # Repo/admin tools
-    elif tool_name == "list_files":
-        return list_files(**tool_input)
-    elif tool_name == "read_file":
-        return read_file(**tool_input)
-    elif tool_name == "write_file":
-        return write_file(**tool_input)
-    elif tool_name == "search_repo":
-        return search_repo(**tool_input)
-    elif tool_name == "git_status":
-        return git_status()
-    elif tool_name == "git_diff":
-        return git_diff(**tool_input)
-    elif tool_name == "publish_changes":
-        return publish_changes(**tool_input)
-    elif tool_name == "restart_service":
-        return restart_service(**tool_input)
-    elif tool_name == "tail_log":
-        return tail_log(**tool_input)
-    elif tool_name == "list_skills":
-        return list_skills_tool()
-    elif tool_name == "install_skill":
-        return install_skill(**tool_input)
-    elif tool_name == "enable_skill":
-        return enable_skill(**tool_input)
-    elif tool_name == "disable_skill":
-        return disable_skill(**tool_input)
-    elif tool_name == "remove_skill":
-        return remove_skill(**tool_input)
-    elif tool_name == "deploy_remote":
-        return deploy_remote(**tool_input)
-    else:
+    "list_files": list_files,
+    "read_file": read_file,
+    "write_file": write_file,
+    "search_repo": search_repo,
+    "git_status": git_status,
+    "git_diff": git_diff,
+    "publish_changes": publish_changes,
+    "restart_service": restart_service,
+    "tail_log": tail_log,
+    "list_skills": list_skills_tool,
+    "install_skill": install_skill,
+    "enable_skill": enable_skill,
+    "disable_skill": disable_skill,
+    "remove_skill": remove_skill,
+    "deploy_remote": deploy_remote,
+}
+
+# Tools that only read state. Callers batching several tool_use blocks
+# can run these concurrently; anything not listed here mutates something
+# (entries, files, git, services) and must stay sequential.
+READ_ONLY_TOOLS = frozenset({
+    "list_entries",
+    "search_entries",
+    "get_entry",
+    "read_journal",
+    "search_journal",
+    "list_reminders",
+    "get_audio_file",
+    "list_files",
+    "read_file",
+    "search_repo",
+    "git_status",
+    "git_diff",
+    "tail_log",
+    "list_skills",
+})
+
+# Required input keys per tool, derived from the schema once at import so
+# execute_tool can reject malformed input with a clear envelope instead of
+# a TypeError from deep inside a handler.
+_REQUIRED_KEYS = {
+    t["name"]: tuple(t["input_schema"].get("required", ()))
+    for t in TOOL_DEFINITIONS
+}
+
+
+def execute_tool(tool_name: str, tool_input: Dict) -> Dict:
+    """Execute a tool by name with given input."""
+    handler = _DISPATCH.get(tool_name)
+    if handler is None:
         return {
             "success": False,
             "error": f"Unknown tool: {tool_name}"
         }
+    missing = [k for k in _REQUIRED_KEYS.get(tool_name, ()) if k not in tool_input]
+    if missing:
+        return {
+            "success": False,
+            "error": f"Missing required input for {tool_name}: {', '.join(missing)}"
+        }
+    return handler(**tool_input)
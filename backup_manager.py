@@ -1,14 +1,69 @@
 """Backup and export functionality for Second Brain."""
+import json
+import os
 import zipfile
 import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import logging
 
-from config import BRAIN_DIR, JOURNAL_DIR
+from config import BASE_DIR, BRAIN_DIR, JOURNAL_DIR
 
 logger = logging.getLogger(__name__)
 
+# Manifest of the last backup: the archive path plus a {arcname: [mtime_ns,
+# size]} snapshot of every file that went into it. When nothing has changed
+# since, create_backup hands back the previous archive instead of
+# re-deflating the whole tree.
+MANIFEST_FILE = BASE_DIR / ".backup_index.json"
+
+# Already-compressed formats: deflating these burns CPU (the dominant cost
+# on the Pi) to shave at best a percent or two, so store them as-is.
+_STORED_SUFFIXES = {'.ogg', '.oga', '.mp3', '.m4a', '.jpg', '.jpeg', '.png', '.zip', '.gz'}
+
+
+def _iter_backup_files():
+    """Yield (file_path, arcname) for everything that goes in a backup."""
+    for tree_root in (BRAIN_DIR, JOURNAL_DIR):
+        if tree_root.exists():
+            for file_path in tree_root.rglob('*'):
+                if file_path.is_file():
+                    yield file_path, str(file_path.relative_to(tree_root.parent))
+
+
+def _read_for_backup(item):
+    """Read one file for the zip writer, preserving its metadata."""
+    file_path, arcname = item
+    zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+    zinfo.compress_type = (
+        zipfile.ZIP_STORED
+        if file_path.suffix.lower() in _STORED_SUFFIXES
+        else zipfile.ZIP_DEFLATED
+    )
+    return zinfo, file_path.read_bytes()
+
+
+def _tree_snapshot(items) -> dict:
+    """Map arcname -> [mtime_ns, size] for the files going into a backup."""
+    snapshot = {}
+    for file_path, arcname in items:
+        try:
+            st = file_path.stat()
+        except OSError:
+            continue
+        snapshot[arcname] = [st.st_mtime_ns, st.st_size]
+    return snapshot
+
+
+def _load_manifest() -> dict:
+    try:
+        with MANIFEST_FILE.open('r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
 
 def create_backup() -> Path:
     """
@@ -17,6 +72,18 @@ def create_backup() -> Path:
     Returns:
         Path to the created ZIP file
     """
+    items = list(_iter_backup_files())
+    snapshot = _tree_snapshot(items)
+
+    # If nothing changed since the last backup and that archive still
+    # exists, reuse it rather than re-deflating an identical tree.
+    manifest = _load_manifest()
+    if manifest.get("files") == snapshot:
+        previous = Path(manifest.get("archive", ""))
+        if previous.is_file():
+            logger.info(f"No changes since last backup, reusing {previous}")
+            return previous
+
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     backup_filename = f"second_brain_backup_{timestamp}.zip"
 
@@ -27,22 +94,36 @@ def create_backup() -> Path:
     logger.info(f"Creating backup: {backup_path}")
 
     try:
+        # Reads happen in a small thread pool (overlapping disk I/O, where
+        # the GIL is released) while the single zip writer consumes them
+        # in order; zip output itself must stay sequential. Only a small
+        # window of reads is in flight at once, so at most that many
+        # files' bytes are resident ahead of the writer - pool.map would
+        # buffer every completed read and could hold the whole audio tree
+        # in memory on the Pi.
         with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Backup brain directory (JSON files)
-            if BRAIN_DIR.exists():
-                for file_path in BRAIN_DIR.rglob('*'):
-                    if file_path.is_file():
-                        arcname = file_path.relative_to(BRAIN_DIR.parent)
-                        zipf.write(file_path, arcname)
-                        logger.debug(f"Added to backup: {arcname}")
-
-            # Backup journal directory (entries and audio)
-            if JOURNAL_DIR.exists():
-                for file_path in JOURNAL_DIR.rglob('*'):
-                    if file_path.is_file():
-                        arcname = file_path.relative_to(JOURNAL_DIR.parent)
-                        zipf.write(file_path, arcname)
-                        logger.debug(f"Added to backup: {arcname}")
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                it = iter(items)
+                pending = deque()
+                for item in it:
+                    pending.append(pool.submit(_read_for_backup, item))
+                    if len(pending) >= 8:
+                        break
+                while pending:
+                    zinfo, data = pending.popleft().result()
+                    next_item = next(it, None)
+                    if next_item is not None:
+                        pending.append(pool.submit(_read_for_backup, next_item))
+                    zipf.writestr(zinfo, data)
+                    logger.debug(f"Added to backup: {zinfo.filename}")
+
+        try:
+            with MANIFEST_FILE.open('w', encoding='utf-8') as f:
+                json.dump({"archive": str(backup_path), "files": snapshot}, f)
+        except OSError as e:
+            # Backup succeeded; losing the manifest only costs the reuse
+            # shortcut next time.
+            logger.warning(f"Failed to write backup manifest: {e}")
 
         # Get file size for logging
         size_mb = backup_path.stat().st_size / (1024 * 1024)
@@ -55,6 +136,37 @@ def create_backup() -> Path:
         raise
 
 
+def _tree_stats(root: Path) -> tuple:
+    """
+    Walk a tree once with scandir, reusing the cached DirEntry stat data.
+
+    Returns:
+        (file_count, total_bytes, md_count, ogg_count)
+    """
+    files = total = md = ogg = 0
+    stack = [str(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        files += 1
+                        total += entry.stat().st_size
+                        if entry.name.endswith('.md'):
+                            md += 1
+                        elif entry.name.endswith('.ogg'):
+                            ogg += 1
+                except OSError:
+                    continue
+    return files, total, md, ogg
+
+
 def get_backup_stats() -> dict:
     """
     Get statistics about what will be backed up.
@@ -72,23 +184,16 @@ def get_backup_stats() -> dict:
     }
 
     try:
-        # Count brain files
         if BRAIN_DIR.exists():
-            brain_files = list(BRAIN_DIR.rglob('*'))
-            stats["brain_files"] = len([f for f in brain_files if f.is_file()])
-            stats["brain_size_mb"] = sum(f.stat().st_size for f in brain_files if f.is_file()) / (1024 * 1024)
+            brain_files, brain_bytes, _, _ = _tree_stats(BRAIN_DIR)
+            stats["brain_files"] = brain_files
+            stats["brain_size_mb"] = brain_bytes / (1024 * 1024)
 
-        # Count journal files
         if JOURNAL_DIR.exists():
-            journal_files = list(JOURNAL_DIR.rglob('*'))
-            for f in journal_files:
-                if f.is_file():
-                    if f.suffix == '.md':
-                        stats["journal_entries"] += 1
-                    elif f.suffix == '.ogg':
-                        stats["audio_files"] += 1
-
-            stats["journal_size_mb"] = sum(f.stat().st_size for f in journal_files if f.is_file()) / (1024 * 1024)
+            _, journal_bytes, md_count, ogg_count = _tree_stats(JOURNAL_DIR)
+            stats["journal_entries"] = md_count
+            stats["audio_files"] = ogg_count
+            stats["journal_size_mb"] = journal_bytes / (1024 * 1024)
 
         stats["total_size_mb"] = stats["brain_size_mb"] + stats["journal_size_mb"]
 
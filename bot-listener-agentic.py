@@ -4,15 +4,17 @@ Agentic Telegram bot for Second Brain.
 Uses Claude with tool use API for natural conversational interaction.
 Claude has direct access to storage tools and maintains conversation history.
 """
+import asyncio
 import logging
 import json
+from collections import defaultdict
 from telegram import Update
 from telegram.ext import Application, MessageHandler, ContextTypes, filters, CommandHandler
 
 from config import TELEGRAM_TOKEN, ANTHROPIC_API_KEY
 from classifier import get_client
 from storage import init_storage
-from agent_tools import TOOL_DEFINITIONS, execute_tool
+from agent_tools import TOOL_DEFINITIONS, READ_ONLY_TOOLS, execute_tool
 from conversation_state import get_conversation_history, add_message, clear_conversation
 
 # Logging setup
@@ -26,8 +28,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# System prompt for the agent
-AGENT_SYSTEM_PROMPT = """You are a personal knowledge management assistant helping a user organize their "second brain."
+# System prompt for the agent: core rules only. The worked examples live
+# in AGENT_FEWSHOTS and ride along as a cached warm-up exchange instead.
+AGENT_SYSTEM_CORE = """You are a personal knowledge management assistant helping a user organize their "second brain."
 
 AVAILABLE CATEGORIES:
 - people: Information about specific people (names, relationships, facts)
@@ -53,7 +56,10 @@ BEHAVIOR GUIDELINES:
 6. **Honesty**: Only use tools to access real data. Never make up or hallucinate information
 7. **Clarification**: If ambiguous, ask user to clarify (e.g., "which entry?" if multiple matches)
 
-EXAMPLES:
+Be concise and natural. Confirm actions when you perform them."""
+
+AGENT_FEWSHOTS = """Here is how to handle typical messages:
+
 User: "Felipe es mi socio"
 → create_entry(category="people", message="Felipe es mi socio", confidence=0.9)
 → Respond: "Guardado en people (90%)"
@@ -69,9 +75,139 @@ User: "no hace falta clasificar ballbox"
 
 User: "the one in inbox"
 → Remember previous search context, filter to inbox entry
-→ delete_entry with that entry
-
-Be concise and natural. Confirm actions when you perform them."""
+→ delete_entry with that entry"""
+
+# Static prefix (system prompt + tool schema) marked for Anthropic prompt
+# caching: the cache breakpoints sit on the last system block and the last
+# tool definition, so every call after the first reads this large prefix
+# from cache instead of re-processing it.
+CACHED_SYSTEM = [
+    {"type": "text", "text": AGENT_SYSTEM_CORE, "cache_control": {"type": "ephemeral"}}
+]
+
+# The examples go in as a warm-up exchange at the start of every
+# transcript, with its own cache breakpoint so the (system, tools,
+# few-shots) prefix is one long cache hit.
+AGENT_FEWSHOT_MESSAGES = [
+    {"role": "user", "content": [{"type": "text", "text": AGENT_FEWSHOTS}]},
+    {
+        "role": "assistant",
+        "content": [
+            {
+                "type": "text",
+                "text": "Entendido. Usaré las herramientas siguiendo esos patrones.",
+                "cache_control": {"type": "ephemeral"},
+            }
+        ],
+    },
+]
+CACHED_TOOLS = list(TOOL_DEFINITIONS)
+CACHED_TOOLS[-1] = {**CACHED_TOOLS[-1], "cache_control": {"type": "ephemeral"}}
+
+
+def _cached_messages(messages: list) -> list:
+    """Copy of messages with a cache breakpoint on the final content block.
+
+    The tool-use loop resends the whole growing transcript every
+    iteration; marking the last block makes each call extend the cached
+    prefix from the previous one instead of re-processing it. The
+    breakpoint rotates forward as messages are appended, which together
+    with the system and tools breakpoints stays within Anthropic's
+    four-breakpoint limit. The input list is not mutated, so no stale
+    cache_control markers accumulate on earlier turns.
+    """
+    if not messages:
+        return messages
+    last = messages[-1]
+    content = last["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}]
+    elif content and isinstance(content[-1], dict):
+        content = list(content)
+        content[-1] = {**content[-1], "cache_control": {"type": "ephemeral"}}
+    else:
+        return messages
+    return messages[:-1] + [{**last, "content": content}]
+
+
+# Concurrency bounds: one in-flight agent run per chat keeps a burst of
+# messages from the same conversation processing in order (and from
+# interleaving their history writes), while the global bound caps
+# simultaneous Claude calls below rate-limit territory.
+_CHAT_SEMAPHORES: defaultdict = defaultdict(lambda: asyncio.Semaphore(1))
+_GLOBAL_SEMAPHORE = asyncio.Semaphore(8)
+
+# Input budget: ~3k tokens of history at roughly 4 chars/token. Older
+# turns beyond it are dropped; the live message always survives.
+_HISTORY_CHAR_BUDGET = 12_000
+# Tool results bigger than this get replaced by a truncated preview so a
+# single oversized lookup can't balloon every later loop iteration.
+_TOOL_RESULT_CHAR_CAP = 8_000
+
+
+def _trim_history(turns: list) -> list:
+    """Drop oldest turns until the transcript fits the character budget.
+
+    The trimmed transcript is appended after the few-shot prefix, which
+    ends on an assistant turn, so it must resume with a user turn - the
+    API rejects non-alternating roles. The final (live user) turn always
+    survives.
+    """
+    total = sum(len(str(t["content"])) for t in turns)
+    trimmed = list(turns)
+    while len(trimmed) > 1 and (
+        total > _HISTORY_CHAR_BUDGET or trimmed[0]["role"] != "user"
+    ):
+        dropped = trimmed.pop(0)
+        total -= len(str(dropped["content"]))
+        logger.info(f"Trimmed a {dropped['role']} turn from history to fit token budget")
+    return trimmed
+
+
+async def _run_tools(tool_uses: list, chat_id: int, telegram_message_id: int) -> list:
+    """Execute a batch of requested tools and build their result blocks.
+
+    Read-only tools (storage/file/git queries) run concurrently via
+    asyncio.gather, so a batch of independent lookups costs the slowest
+    one. Mutating tools run sequentially afterwards, in request order,
+    to keep their side effects deterministic. Results are returned in
+    the order Claude requested them regardless of completion order.
+    """
+    results = {}
+
+    read_only = [tu for tu in tool_uses if tu.name in READ_ONLY_TOOLS]
+    if read_only:
+        for tu in read_only:
+            logger.info(f"Executing tool: {tu.name} with input: {tu.input}")
+        gathered = await asyncio.gather(
+            *(asyncio.to_thread(execute_tool, tu.name, tu.input) for tu in read_only)
+        )
+        results.update({tu.id: result for tu, result in zip(read_only, gathered)})
+
+    for tu in tool_uses:
+        if tu.id in results:
+            continue
+        tool_input = tu.input
+        # Attach message provenance for create_entry
+        if tu.name == "create_entry":
+            tool_input = {**tool_input, "chat_id": chat_id, "message_id": telegram_message_id}
+        logger.info(f"Executing tool: {tu.name} with input: {tool_input}")
+        results[tu.id] = await asyncio.to_thread(execute_tool, tu.name, tool_input)
+
+    for tu in tool_uses:
+        logger.info(f"Tool result: {results[tu.id]}")
+
+    blocks = []
+    for tu in tool_uses:
+        content = json.dumps(results[tu.id])
+        if len(content) > _TOOL_RESULT_CHAR_CAP:
+            content = json.dumps({
+                "truncated": True,
+                "keys": sorted(results[tu.id]),
+                "preview": content[:_TOOL_RESULT_CHAR_CAP],
+            })
+        blocks.append({"type": "tool_result", "tool_use_id": tu.id, "content": content})
+    return blocks
 
 
 async def process_message_with_agent(chat_id: int, user_message: str, telegram_message_id: int) -> str:
@@ -83,9 +219,12 @@ async def process_message_with_agent(chat_id: int, user_message: str, telegram_m
     # Get conversation history
     history = get_conversation_history(chat_id, limit=10)
 
-    # Build messages for Claude API (remove timestamp field for API call)
-    messages = [{"role": msg["role"], "content": msg["content"]} for msg in history]
-    messages.append({"role": "user", "content": user_message})
+    # Build messages for Claude API (remove timestamp field for API call),
+    # with the cached few-shot warm-up ahead of the budget-trimmed
+    # conversation
+    turns = [{"role": msg["role"], "content": msg["content"]} for msg in history]
+    turns.append({"role": "user", "content": user_message})
+    messages = [*AGENT_FEWSHOT_MESSAGES, *_trim_history(turns)]
 
     # Store user message in history
     add_message(chat_id, "user", user_message)
@@ -97,9 +236,9 @@ async def process_message_with_agent(chat_id: int, user_message: str, telegram_m
         response = get_client().messages.create(
             model="claude-sonnet-4-20250514",
             max_tokens=4096,
-            system=AGENT_SYSTEM_PROMPT,
-            tools=TOOL_DEFINITIONS,
-            messages=messages
+            system=CACHED_SYSTEM,
+            tools=CACHED_TOOLS,
+            messages=_cached_messages(messages)
         )
 
         # Handle tool use loop
@@ -109,30 +248,8 @@ async def process_message_with_agent(chat_id: int, user_message: str, telegram_m
 
             logger.info(f"Agent requested {len(tool_uses)} tool calls")
 
-            # Execute each tool and collect results
-            tool_results = []
-            for tool_use in tool_uses:
-                tool_name = tool_use.name
-                tool_input = tool_use.input
-
-                logger.info(f"Executing tool: {tool_name} with input: {tool_input}")
-
-                # Execute the tool
-                result = execute_tool(tool_name, tool_input)
-
-                # Pass chat_id and message_id for create_entry
-                if tool_name == "create_entry":
-                    tool_input["chat_id"] = chat_id
-                    tool_input["message_id"] = telegram_message_id
-                    result = execute_tool(tool_name, tool_input)
-
-                logger.info(f"Tool result: {result}")
-
-                tool_results.append({
-                    "type": "tool_result",
-                    "tool_use_id": tool_use.id,
-                    "content": json.dumps(result)
-                })
+            # Execute the batch and collect results
+            tool_results = await _run_tools(tool_uses, chat_id, telegram_message_id)
 
             # Add assistant's tool use and tool results to messages
             messages.append({"role": "assistant", "content": response.content})
@@ -142,9 +259,9 @@ async def process_message_with_agent(chat_id: int, user_message: str, telegram_m
             response = get_client().messages.create(
                 model="claude-sonnet-4-20250514",
                 max_tokens=4096,
-                system=AGENT_SYSTEM_PROMPT,
-                tools=TOOL_DEFINITIONS,
-                messages=messages
+                system=CACHED_SYSTEM,
+                tools=CACHED_TOOLS,
+                messages=_cached_messages(messages)
             )
 
         # Extract final text response
@@ -174,11 +291,12 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     logger.info(f"Received: chat_id={chat_id} msg_id={message_id} text={text[:50]}")
 
     try:
-        # Process with agent
-        response = await process_message_with_agent(chat_id, text, message_id)
+        # Process with agent, bounded per chat and globally
+        async with _CHAT_SEMAPHORES[chat_id], _GLOBAL_SEMAPHORE:
+            response = await process_message_with_agent(chat_id, text, message_id)
 
-        # Send response
-        await message.reply_text(response)
+            # Send response
+            await message.reply_text(response)
 
         logger.info(f"Responded: {response[:100]}")
 
@@ -211,6 +329,14 @@ def main():
     if not ANTHROPIC_API_KEY:
         raise ValueError("ANTHROPIC_API_KEY not set. Create .env file with ANTHROPIC_API_KEY=your_key")
 
+    # Optional: libuv-backed event loop when available
+    try:
+        import uvloop
+        uvloop.install()
+        logger.info("Using uvloop event loop")
+    except ImportError:
+        pass
+
     # Initialize storage
     init_storage()
 
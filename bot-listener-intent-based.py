@@ -6,20 +6,32 @@ Handles:
 - Reply-based corrections via AI reasoning
 - AI-driven delete, correct, store, respond actions
 """
+import asyncio
 import logging
 import json
+import re
+from collections import defaultdict
 from datetime import datetime
 
 from telegram import Update
 from telegram.ext import Application, MessageHandler, ContextTypes, filters
 
+import semantic_cache
 from config import TELEGRAM_TOKEN, CATEGORIES, CONFIDENCE_THRESHOLD, ANTHROPIC_API_KEY
+
+# Context enrichment is optional; the bot runs without it. Imported once
+# here instead of inside the per-message hot paths.
+try:
+    from context_manager import load_context, enrich_context
+except ImportError:
+    load_context = None
+    enrich_context = None
 from classifier import get_client
 from storage import (
     init_storage,
     create_entry,
     get_entry_by_message_id,
-    get_recent_entries,
+    get_recent_entries_multi,
     move_entry,
     delete_entry,
     log_audit,
@@ -36,8 +48,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Intent determination system prompt
-INTENT_SYSTEM_PROMPT = """You are a personal knowledge management assistant. Analyze incoming messages and decide what action to take.
+# Intent determination system prompt: core rules and output schema only;
+# the worked examples ride along as a cached few-shot exchange below.
+INTENT_SYSTEM_CORE = """You are a personal knowledge management assistant. Analyze incoming messages and decide what action to take.
 
 AVAILABLE ACTIONS:
 - "store": New information to save. Classify into: people, projects, ideas, admin
@@ -61,21 +74,81 @@ DECISION GUIDELINES:
 6. If user asks a question → "respond"
 7. If user says "no" or "no hace falta" without context → could be delete or ignore, check reply_to
 
-EXAMPLES:
+Return JSON ONLY (no markdown blocks):
+{"action": "store|correct|delete|ignore|respond", "category": "people|projects|ideas|admin|null", "target_entry_id": "uuid|null", "confidence": 0.0-1.0, "reasoning": "brief explanation", "response": "text for respond action|null"}
+"""
+
+INTENT_FEWSHOTS = """Examples of messages and the action to take:
 - "Felipe is my business partner" → store/people
 - "no hace falta, clasificar ballbox" → delete (the entry wasn't needed)
 - "actually that's a project not a person" → correct to projects
 - "people" (as reply to classification) → correct to people
 - "ok thanks" → ignore
-- "what did I save about Felipe?" → respond
-
-Return JSON ONLY (no markdown blocks):
-{"action": "store|correct|delete|ignore|respond", "category": "people|projects|ideas|admin|null", "target_entry_id": "uuid|null", "confidence": 0.0-1.0, "reasoning": "brief explanation", "response": "text for respond action|null"}
-"""
-
-
-def gather_context_for_intent(text: str, reply_context: dict = None) -> str:
-    """Build context string for Claude's intent determination."""
+- "what did I save about Felipe?" → respond"""
+
+# Forced tool schema for intent determination: with tool_choice pinned to
+# this tool the model cannot wrap its decision in markdown fences, and the
+# SDK hands back parsed input directly - no string surgery, no json.loads
+# on the happy path.
+EMIT_INTENT_TOOL = {
+    "name": "emit_intent",
+    "description": "Report the decided action for the user's message.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "action": {
+                "type": "string",
+                "enum": ["store", "correct", "delete", "ignore", "respond"],
+            },
+            "category": {
+                "type": ["string", "null"],
+                "description": "Target category for store/correct, else null",
+            },
+            "target_entry_id": {
+                "type": ["string", "null"],
+                "description": "UUID of the entry to correct/delete, else null",
+            },
+            "confidence": {"type": "number", "minimum": 0.0, "maximum": 1.0},
+            "reasoning": {"type": "string", "description": "Brief explanation"},
+            "response": {
+                "type": ["string", "null"],
+                "description": "Reply text for the respond action, else null",
+            },
+        },
+        "required": ["action", "confidence", "reasoning"],
+    },
+}
+
+# System prompt marked for Anthropic prompt caching; it is identical on
+# every intent call, so after the first request it is read from cache.
+CACHED_INTENT_SYSTEM = [
+    {"type": "text", "text": INTENT_SYSTEM_CORE, "cache_control": {"type": "ephemeral"}}
+]
+
+# Few-shot examples as a warm-up exchange with its own cache breakpoint,
+# extending the cached prefix to everything before the live message.
+INTENT_FEWSHOT_MESSAGES = [
+    {"role": "user", "content": [{"type": "text", "text": INTENT_FEWSHOTS}]},
+    {
+        "role": "assistant",
+        "content": [
+            {
+                "type": "text",
+                "text": '{"action": "ignore", "category": null, "target_entry_id": null, "confidence": 1.0, "reasoning": "Acknowledged examples", "response": null}',
+                "cache_control": {"type": "ephemeral"},
+            }
+        ],
+    },
+]
+
+
+async def gather_context_for_intent(text: str, reply_context: dict = None) -> str:
+    """Build context string for Claude's intent determination.
+
+    The per-category reads run concurrently via asyncio.to_thread, so the
+    latency of this step is the slowest single file instead of the sum of
+    all five.
+    """
     parts = [f"[USER MESSAGE]\n{text}"]
 
     # Add reply context if available
@@ -88,32 +161,35 @@ def gather_context_for_intent(text: str, reply_context: dict = None) -> str:
         parts.append(f"Confidence: {entry.get('confidence', 0)}")
         parts.append(f"Bot said: {reply_context.get('bot_confirmation', '')}")
 
-    # Add recent entries for context
+    # Add recent entries for context (all categories in one storage call)
+    cats = CATEGORIES + ["inbox"]
     recent = []
-    for cat in CATEGORIES + ["inbox"]:
-        try:
-            entries = get_recent_entries(cat, limit=2)
-            for e in entries:
-                msg_preview = e.get('raw_message', '')[:50]
-                recent.append(f"[{cat}] {msg_preview}")
-        except:
-            pass
+    try:
+        per_category = await asyncio.to_thread(get_recent_entries_multi, cats, 2)
+    except (OSError, json.JSONDecodeError):
+        per_category = {}
+    for cat in cats:
+        for e in per_category.get(cat, ()):
+            msg_preview = e.get('raw_message', '')[:50]
+            recent.append(f"[{cat}] {msg_preview}")
 
     if recent:
         parts.append(f"\n[RECENT ENTRIES]\n" + "\n".join(recent[:5]))
 
-    # Add category contexts
-    try:
-        from context_manager import load_context
+    # Add category contexts, also gathered concurrently
+    if load_context is not None:
+        contexts = await asyncio.gather(
+            *(asyncio.to_thread(load_context, cat) for cat in CATEGORIES),
+            return_exceptions=True,
+        )
         context_parts = []
-        for cat in CATEGORIES:
-            ctx = load_context(cat)
-            if ctx and len(ctx.strip()) > 20:
+        for cat, ctx in zip(CATEGORIES, contexts):
+            if isinstance(ctx, Exception) or not ctx:
+                continue
+            if len(ctx.strip()) > 20:
                 context_parts.append(f"\n[{cat.upper()} CONTEXT]\n{ctx[:200]}...")
         if context_parts:
             parts.append("\n".join(context_parts))
-    except:
-        pass
 
     return "\n".join(parts)
 
@@ -142,27 +218,41 @@ async def determine_intent(message_text: str, reply_context: dict = None) -> dic
             "response": None
         }
 
+    # Semantic cache: a near-duplicate of a recently decided message
+    # (scoped to the replied-to entry, if any) skips the API round trip.
+    # Only non-mutating intents are ever cached, so replays are safe.
+    cache_namespace = (reply_context or {}).get("entry", {}).get("id")
+    try:
+        cached_intent = semantic_cache.get(message_text, cache_namespace)
+        if cached_intent is not None:
+            return cached_intent
+    except Exception as e:
+        logger.warning(f"Semantic cache lookup failed: {e}")
+
     # Build context
-    context = gather_context_for_intent(message_text, reply_context)
+    context = await gather_context_for_intent(message_text, reply_context)
 
     try:
         response = get_client().messages.create(
             model="claude-sonnet-4-20250514",
             max_tokens=300,
-            system=INTENT_SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": context}]
+            system=CACHED_INTENT_SYSTEM,
+            tools=[EMIT_INTENT_TOOL],
+            tool_choice={"type": "tool", "name": "emit_intent"},
+            messages=[*INTENT_FEWSHOT_MESSAGES, {"role": "user", "content": context}]
         )
 
-        content = response.content[0].text.strip()
-
-        # Parse JSON response
-        if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-        content = content.strip()
-
-        result = json.loads(content)
+        tool_use = next((b for b in response.content if b.type == "tool_use"), None)
+        if tool_use is not None:
+            result = dict(tool_use.input)
+        else:
+            # Defensive fallback: parse a plain-text reply the old way
+            content = response.content[0].text.strip()
+            if content.startswith("```"):
+                content = content.split("```")[1]
+                if content.startswith("json"):
+                    content = content[4:]
+            result = json.loads(content.strip())
 
         # Validate and set defaults
         result.setdefault("action", "store")
@@ -178,6 +268,12 @@ async def determine_intent(message_text: str, reply_context: dict = None) -> dic
 
         logger.info(f"Intent determined: {result['action']} (confidence: {result['confidence']})")
 
+        if result["action"] not in ("store", "correct", "delete"):
+            try:
+                semantic_cache.put(message_text, result, cache_namespace)
+            except Exception as e:
+                logger.warning(f"Semantic cache store failed: {e}")
+
         return result
 
     except json.JSONDecodeError as e:
@@ -232,9 +328,8 @@ async def execute_action(message, intent: dict, reply_context: dict = None) -> N
                   {"reasoning": intent.get("reasoning")})
 
         # Enrich context for high-confidence
-        if category != "inbox" and confidence >= CONFIDENCE_THRESHOLD:
+        if enrich_context is not None and category != "inbox" and confidence >= CONFIDENCE_THRESHOLD:
             try:
-                from context_manager import enrich_context
                 enrich_context(category, entry)
                 logger.info(f"Enriched {category} context")
             except Exception as e:
@@ -291,24 +386,47 @@ async def execute_action(message, intent: dict, reply_context: dict = None) -> N
             category = reply_context["category"]
         else:
             # No reply context, search for recent entries matching keywords
-            keywords = message.text.lower().split()
-            # Remove common words that don't help identify entries
-            stop_words = {"no", "hace", "falta", "clasificar", "delete", "remove", "borrar", "eliminar"}
-            keywords = [k for k in keywords if k not in stop_words and len(k) > 2]
+            # (minus stop words that don't help identify entries)
+            keywords = [
+                k for k in message.text.lower().split()
+                if k not in _STOP_WORDS and len(k) > 2
+            ]
 
             if keywords:
-                # Search recent entries across all categories
-                matches = []
-                for cat in CATEGORIES + ["inbox"]:
+                # Prefer the FTS index: one MATCH query over every
+                # category instead of a Python substring scan (the
+                # stop-word filter already guarantees >= 3 chars, which
+                # is what the trigram tokenizer needs)
+                matches = None
+                try:
+                    import search_index
+                    if search_index.refresh_index():
+                        from storage import get_entries_by_ids
+                        rows = search_index.search_any(keywords, limit=10)
+                        found = get_entries_by_ids([eid for eid, _ in rows])
+                        matches = [
+                            (found[eid][0], cat) for eid, cat in rows if eid in found
+                        ]
+                except Exception as e:
+                    logger.warning(f"Keyword index lookup failed, scanning recent entries: {e}")
+
+                if matches is None:
+                    # Fallback: scan recent entries across all categories
+                    cats = CATEGORIES + ["inbox"]
                     try:
-                        entries = get_recent_entries(cat, limit=10)
-                        for e in entries:
-                            msg_lower = e.get('raw_message', '').lower()
-                            # Check if any keyword matches
-                            if any(kw in msg_lower for kw in keywords):
+                        per_category = await asyncio.to_thread(
+                            get_recent_entries_multi, cats, 10
+                        )
+                    except (OSError, json.JSONDecodeError):
+                        per_category = {}
+                    # One compiled alternation: C-level scan per message
+                    # instead of a Python substring loop per keyword
+                    pattern = re.compile("|".join(map(re.escape, keywords)))
+                    matches = []
+                    for cat in cats:
+                        for e in per_category.get(cat, ()):
+                            if pattern.search(e.get('raw_message', '').lower()):
                                 matches.append((e, cat))
-                    except:
-                        pass
 
                 if len(matches) == 1:
                     # Found exactly one match
@@ -356,6 +474,18 @@ async def execute_action(message, intent: dict, reply_context: dict = None) -> N
         logger.info(f"Responded: {response[:50]}")
 
 
+# Words too generic to identify an entry in the delete-fallback search
+_STOP_WORDS = frozenset(
+    {"no", "hace", "falta", "clasificar", "delete", "remove", "borrar", "eliminar"}
+)
+
+# Concurrency bounds: one in-flight message per chat so a burst from the
+# same conversation is handled in order, plus a global cap on
+# simultaneous Claude calls to stay clear of rate limits.
+_CHAT_SEMAPHORES: defaultdict = defaultdict(lambda: asyncio.Semaphore(1))
+_GLOBAL_SEMAPHORE = asyncio.Semaphore(8)
+
+
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle incoming text messages with AI-driven intent determination."""
     if not update.message or not update.message.text:
@@ -385,13 +515,14 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                 }
                 logger.info(f"Found reply context: entry={entry['id']}, category={category}")
 
-    # Let Claude decide what to do
+    # Let Claude decide what to do, bounded per chat and globally
     try:
-        intent = await determine_intent(text, reply_context)
-        logger.info(f"Intent: {intent['action']} -> {intent.get('category', 'N/A')}")
+        async with _CHAT_SEMAPHORES[chat_id], _GLOBAL_SEMAPHORE:
+            intent = await determine_intent(text, reply_context)
+            logger.info(f"Intent: {intent['action']} -> {intent.get('category', 'N/A')}")
 
-        # Execute the action
-        await execute_action(message, intent, reply_context)
+            # Execute the action
+            await execute_action(message, intent, reply_context)
 
     except Exception as e:
         logger.error(f"Error processing message: {e}")
@@ -408,6 +539,14 @@ def main():
     if not TELEGRAM_TOKEN:
         raise ValueError("TELEGRAM_TOKEN not set. Create .env file with TELEGRAM_TOKEN=your_token")
 
+    # Optional: libuv-backed event loop when available
+    try:
+        import uvloop
+        uvloop.install()
+        logger.info("Using uvloop event loop")
+    except ImportError:
+        pass
+
     # Initialize storage
     init_storage()
 
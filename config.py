@@ -1,5 +1,6 @@
 """Configuration for Second Brain system."""
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -37,8 +38,9 @@ CONTEXT_FILES = {
     "ideas": BRAIN_DIR / "ideas_context.md",
 }
 
-# Categories
-CATEGORIES = ["people", "projects", "ideas", "admin"]
+# Categories (interned so equality checks on the hot tool-call paths can
+# short-circuit on identity when both sides are interned)
+CATEGORIES = [sys.intern(c) for c in ("people", "projects", "ideas", "admin")]
 
 # Classification
 CONFIDENCE_THRESHOLD = 0.7
@@ -90,6 +90,12 @@ Format as markdown with sections."""
         context_path.write_text(content)
 
 
+# Context file contents keyed by mtime, same freshness rule as the entry
+# caches in storage.py: enrichment or cron rewrites bump the mtime and
+# drop the stale copy automatically.
+_CONTEXT_CACHE: dict = {}
+
+
 def load_context(category: str) -> str:
     """
     Load context for a category, bootstrapping if needed.
@@ -113,9 +119,18 @@ def load_context(category: str) -> str:
             logger.warning(f"Failed to bootstrap {category}: {e}")
             return ""
 
-    # Read context
+    # Read context, reusing the cached copy while the file is unchanged
     try:
+        try:
+            mtime = context_path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        cached = _CONTEXT_CACHE.get(category)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
         content = context_path.read_text()
+        _CONTEXT_CACHE[category] = (mtime, content)
         return content
     except Exception as e:
         logger.error(f"Failed to read context for {category}: {e}")
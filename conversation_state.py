@@ -24,7 +24,7 @@ def _load_conversations() -> Dict:
     try:
         with open(CONVERSATION_FILE) as f:
             return json.load(f)
-    except:
+    except (OSError, json.JSONDecodeError):
         return {}
 
 
@@ -21,17 +21,35 @@ def ensure_embeddings_file():
             json.dump({}, f)
 
 
+# Parsed embeddings keyed by the file's mtime, same freshness rule as the
+# entry caches in storage.py: a search no longer re-parses the whole file
+# unless something (this process or a cron job) has rewritten it.
+_EMBEDDINGS_CACHE = None
+
+
 def load_embeddings() -> dict:
-    """Load all embeddings from storage."""
+    """Load all embeddings from storage (cached until the file changes)."""
+    global _EMBEDDINGS_CACHE
     ensure_embeddings_file()
 
+    try:
+        mtime = EMBEDDINGS_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+
+    if _EMBEDDINGS_CACHE is not None and _EMBEDDINGS_CACHE[0] == mtime:
+        return _EMBEDDINGS_CACHE[1]
+
     try:
         with EMBEDDINGS_FILE.open('r', encoding='utf-8') as f:
-            return json.load(f)
+            embeddings = json.load(f)
     except json.JSONDecodeError:
         logger.warning("Embeddings file corrupted, resetting")
         return {}
 
+    _EMBEDDINGS_CACHE = (mtime, embeddings)
+    return embeddings
+
 
 def save_embeddings(embeddings: dict):
     """Save embeddings to storage."""
@@ -244,9 +262,19 @@ def rebuild_embeddings(storage_module) -> Tuple[int, int]:
     return successful, failed
 
 
+# Stats memo keyed by the same mtime as the embeddings cache; every
+# search consults this, so repeat calls cost one stat() syscall.
+_STATS_CACHE = None
+
+
 def get_embedding_stats() -> dict:
     """Get statistics about stored embeddings."""
+    global _STATS_CACHE
     try:
+        mtime = EMBEDDINGS_FILE.stat().st_mtime_ns if EMBEDDINGS_FILE.exists() else None
+        if _STATS_CACHE is not None and _STATS_CACHE[0] == mtime:
+            return _STATS_CACHE[1]
+
         embeddings = load_embeddings()
 
         stats = {
@@ -258,6 +286,7 @@ def get_embedding_stats() -> dict:
             category = data.get("category", "unknown")
             stats["by_category"][category] = stats["by_category"].get(category, 0) + 1
 
+        _STATS_CACHE = (mtime, stats)
         return stats
 
     except Exception as e:
@@ -1,6 +1,6 @@
 """Journal storage operations for diary entries."""
 import json
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from pathlib import Path
 from typing import Optional, List, Dict
 import subprocess
@@ -147,14 +147,38 @@ def search_journal(query: str, date_from: Optional[date] = None, date_to: Option
     if not JOURNAL_ENTRIES_DIR.exists():
         return []
 
+    # When a bounded date range is given, derive the exact file set from
+    # the YYYY/MM/DD.md layout instead of letting rg walk every journal day
+    search_targets = [str(JOURNAL_ENTRIES_DIR)]
+    if date_from and date_to and 0 <= (date_to - date_from).days <= 366:
+        files = []
+        current = date_from
+        while current <= date_to:
+            day_file = (
+                JOURNAL_ENTRIES_DIR
+                / str(current.year)
+                / f"{current.month:02d}"
+                / f"{current.day:02d}.md"
+            )
+            if day_file.exists():
+                files.append(str(day_file))
+            current += timedelta(days=1)
+        if not files:
+            return []
+        search_targets = files
+
     # Build ripgrep command
+    # --heading/--with-filename pin the output shape the parser below
+    # expects, even when piped or given explicit file arguments
     cmd = [
         "rg",
         "--case-insensitive",
         "--line-number",
+        "--heading",
+        "--with-filename",
         "--context", "2",
         query,
-        str(JOURNAL_ENTRIES_DIR)
+        *search_targets,
     ]
 
     try:
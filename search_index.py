@@ -0,0 +1,154 @@
+"""SQLite FTS5 keyword index over knowledge entries.
+
+The JSON files in brain/ remain the source of truth. This module maintains
+a derived full-text index (trigram tokenizer, so substring matches behave
+like the old `query in message` scan) that is rebuilt per category whenever
+the backing JSON file's mtime changes.
+"""
+import sqlite3
+import logging
+import threading
+
+from config import BRAIN_DIR, STORAGE_FILES
+
+logger = logging.getLogger(__name__)
+
+INDEX_DB = BRAIN_DIR / "search_index.db"
+
+_conn = None
+_fts_available = None
+_indexed_mtimes = {}
+
+# The shared connection (check_same_thread=False) is reached from
+# concurrent tool threads; every use goes through this lock so two
+# threads can't interleave a per-category DELETE+INSERT rebuild and
+# leave duplicated rows. Reentrant because refresh_index and the search
+# helpers all call _get_conn while holding it.
+_conn_lock = threading.RLock()
+
+
+def _get_conn() -> sqlite3.Connection:
+    """Open (once) the index database and ensure the FTS table exists."""
+    global _conn
+    with _conn_lock:
+        if _conn is None:
+            BRAIN_DIR.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(INDEX_DB), check_same_thread=False)
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5("
+                "entry_id UNINDEXED, category UNINDEXED, raw_message, "
+                "tokenize='trigram')"
+            )
+            _conn = conn
+        return _conn
+
+
+def fts_available() -> bool:
+    """Check whether this SQLite build supports FTS5 with trigram tokenizing."""
+    global _fts_available
+    if _fts_available is None:
+        try:
+            _get_conn()
+            _fts_available = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 index unavailable, falling back to scan: {e}")
+            _fts_available = False
+    return _fts_available
+
+
+def refresh_index() -> bool:
+    """
+    Sync stale categories from the JSON store into the index.
+
+    Returns:
+        True if the index is usable, False if FTS is unavailable
+    """
+    if not fts_available():
+        return False
+
+    from storage import get_all_entries
+
+    with _conn_lock:
+        conn = _get_conn()
+        dirty = False
+        for category, path in STORAGE_FILES.items():
+            mtime = path.stat().st_mtime_ns if path.exists() else 0
+            if _indexed_mtimes.get(category) == mtime:
+                continue
+
+            entries = get_all_entries(category)
+            conn.execute("DELETE FROM entries_fts WHERE category = ?", (category,))
+            conn.executemany(
+                "INSERT INTO entries_fts (entry_id, category, raw_message) VALUES (?, ?, ?)",
+                [
+                    (e.get("id"), category, e.get("raw_message", ""))
+                    for e in entries
+                    if e.get("id")
+                ],
+            )
+            _indexed_mtimes[category] = mtime
+            dirty = True
+
+        if dirty:
+            conn.commit()
+    return True
+
+
+def search(query: str, categories: list, limit: int) -> list:
+    """
+    Find entries whose raw_message contains query (case-insensitive).
+
+    Args:
+        query: Substring to search for (must be >= 3 chars for trigrams)
+        categories: Categories to restrict the search to
+        limit: Maximum number of results
+
+    Returns:
+        List of (entry_id, category) tuples
+    """
+    conn = _get_conn()
+    # Quote the query so FTS5 treats it as a literal phrase; the trigram
+    # tokenizer then gives substring semantics matching the old scan.
+    # bm25() ranks best matches first so the LIMIT keeps the most relevant
+    # candidates rather than whichever rows were inserted first.
+    #
+    # The CTE materializes ranked FTS hits before the category filter is
+    # applied, so the planner can never combine MATCH with the ordinary
+    # predicate and fall off the FTS index. Candidates are over-fetched
+    # so the filtered result can still fill `limit`.
+    escaped = '"' + query.replace('"', '""') + '"'
+    placeholders = ",".join("?" for _ in categories)
+    with _conn_lock:
+        rows = conn.execute(
+            f"WITH fts_hits AS ("
+            f"  SELECT entry_id, category, bm25(entries_fts) AS score"
+            f"  FROM entries_fts WHERE entries_fts MATCH ?"
+            f"  ORDER BY score LIMIT ?"
+            f") "
+            f"SELECT entry_id, category FROM fts_hits "
+            f"WHERE category IN ({placeholders}) LIMIT ?",
+            [escaped, limit * 10, *categories, limit],
+        ).fetchall()
+    return rows
+
+
+def search_any(keywords: list, limit: int) -> list:
+    """
+    Find entries whose raw_message contains any of the keywords.
+
+    Args:
+        keywords: Substrings to match (each must be >= 3 chars for trigrams)
+        limit: Maximum number of results
+
+    Returns:
+        List of (entry_id, category) tuples, best matches first
+    """
+    conn = _get_conn()
+    match_expr = " OR ".join('"' + kw.replace('"', '""') + '"' for kw in keywords)
+    with _conn_lock:
+        rows = conn.execute(
+            "SELECT entry_id, category FROM entries_fts WHERE entries_fts MATCH ? "
+            "ORDER BY bm25(entries_fts) LIMIT ?",
+            [match_expr, limit],
+        ).fetchall()
+    return rows
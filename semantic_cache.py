@@ -0,0 +1,76 @@
+"""In-process semantic cache for intent determinations.
+
+Near-duplicate messages ("ok", "gracias", "qué hay en inbox?") keep
+triggering full Claude round trips. This cache keys recent intent
+results by a local embedding of the message text (plus the replied-to
+entry id, so a reply about one entry never answers for another) and
+serves a cached intent when a new message is close enough. Entries
+expire after a short TTL so the cache can't outlive the conversation
+context they were decided in.
+
+Mutating intents (store/correct/delete) must never be cached — replaying
+them would re-run side effects — so callers only put read-only results.
+"""
+import logging
+import time
+from typing import Optional
+
+from embeddings import generate_embedding, cosine_similarity
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_THRESHOLD = 0.95
+TTL_SECONDS = 300
+_MAX_ENTRIES = 256
+
+# Each item: (expires_at, namespace, embedding, value)
+_cache: list = []
+
+
+def _prune(now: float) -> None:
+    global _cache
+    if _cache:
+        _cache = [item for item in _cache if item[0] > now]
+    while len(_cache) > _MAX_ENTRIES:
+        _cache.pop(0)
+
+
+def get(text: str, namespace: str = None) -> Optional[dict]:
+    """Return the cached value for a semantically equivalent text, or None."""
+    now = time.monotonic()
+    _prune(now)
+    if not _cache:
+        return None
+
+    embedding = generate_embedding(text)
+    if not embedding:
+        return None
+
+    best = None
+    best_score = SIMILARITY_THRESHOLD
+    for _, ns, cached_embedding, value in _cache:
+        if ns != namespace:
+            continue
+        score = cosine_similarity(embedding, cached_embedding)
+        if score >= best_score:
+            best = value
+            best_score = score
+
+    if best is not None:
+        logger.info(f"Semantic cache hit (similarity {best_score:.3f})")
+    return best
+
+
+def put(text: str, value: dict, namespace: str = None) -> None:
+    """Cache a value under the embedding of text."""
+    embedding = generate_embedding(text)
+    if not embedding:
+        return
+    now = time.monotonic()
+    _prune(now)
+    _cache.append((now + TTL_SECONDS, namespace, embedding, value))
+
+
+def clear() -> None:
+    """Drop all cached values (for tests and conversation resets)."""
+    _cache.clear()
@@ -1,5 +1,8 @@
 """JSON storage operations for Second Brain."""
+import atexit
 import json
+import queue
+import threading
 import uuid
 from datetime import datetime
 from pathlib import Path
@@ -31,6 +34,11 @@ def _save_json(path: Path, data: list | dict) -> None:
         json.dump(data, f, indent=2, default=str)
 
 
+# Per-category cache of parsed entries, invalidated when the backing
+# file's mtime changes (covers writes from this process and from cron jobs).
+_ENTRIES_CACHE: dict[str, tuple[int, list]] = {}
+
+
 def init_storage() -> None:
     """Initialize all storage files."""
     BRAIN_DIR.mkdir(parents=True, exist_ok=True)
@@ -84,20 +92,66 @@ def create_entry(
     return entry
 
 
+# Per-category id -> entry maps, rebuilt when the backing file's mtime
+# changes (same freshness rule as _ENTRIES_CACHE, so writes from cron jobs
+# in other processes are picked up). Turns ID lookups into dict hits
+# instead of linear scans.
+_ID_INDEX_CACHE: dict[str, tuple[int, dict]] = {}
+
+
+def _id_index(category: str) -> dict:
+    path = STORAGE_FILES.get(category)
+    try:
+        mtime = path.stat().st_mtime_ns if path else None
+    except FileNotFoundError:
+        mtime = None
+
+    cached = _ID_INDEX_CACHE.get(category)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    index = {e.get("id"): e for e in get_all_entries(category)}
+    _ID_INDEX_CACHE[category] = (mtime, index)
+    return index
+
+
 def get_entry_by_id(entry_id: str) -> Optional[tuple[dict, str]]:
     """Find entry by ID across all categories. Returns (entry, category)."""
-    for category, path in STORAGE_FILES.items():
-        entries = _load_json(path)
-        for entry in entries:
-            if entry.get("id") == entry_id:
-                return entry, category
+    for category in STORAGE_FILES:
+        entry = _id_index(category).get(entry_id)
+        if entry is not None:
+            return entry, category
     return None
 
 
+def get_entries_by_ids(entry_ids: list) -> dict:
+    """
+    Find multiple entries by ID in one pass over the category indexes.
+
+    Args:
+        entry_ids: List of entry UUIDs
+
+    Returns:
+        Dict mapping entry_id -> (entry, category) for the IDs found
+    """
+    wanted = set(entry_ids)
+    found = {}
+    for category in STORAGE_FILES:
+        if not wanted:
+            break
+        index = _id_index(category)
+        for entry_id in list(wanted):
+            entry = index.get(entry_id)
+            if entry is not None:
+                found[entry_id] = (entry, category)
+                wanted.discard(entry_id)
+    return found
+
+
 def get_entry_by_message_id(chat_id: int, message_id: int) -> Optional[tuple[dict, str]]:
     """Find entry by Telegram message ID. Returns (entry, category)."""
-    for category, path in STORAGE_FILES.items():
-        entries = _load_json(path)
+    for category in STORAGE_FILES:
+        entries = get_all_entries(category)
         for entry in entries:
             if entry.get("chat_id") == chat_id and entry.get("message_id") == message_id:
                 return entry, category
@@ -161,18 +215,72 @@ def delete_entry(entry_id: str, category: str) -> bool:
     return False
 
 
-def get_all_entries(category: str) -> list:
-    """Get all entries in a category."""
+def get_all_entries(category: str, limit: int = None) -> list:
+    """
+    Get entries in a category, optionally capped at the first `limit`.
+
+    The JSON backing still has to be parsed whole, but pushing the limit
+    down here means only `limit` rows are copied out and handed around.
+    """
     path = STORAGE_FILES.get(category)
     if not path:
         return []
-    return _load_json(path)
+
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+
+    cached = _ENTRIES_CACHE.get(category)
+    if cached is not None and cached[0] == mtime:
+        entries = cached[1]
+    else:
+        entries = _load_json(path)
+        if mtime is None:
+            mtime = path.stat().st_mtime_ns
+        _ENTRIES_CACHE[category] = (mtime, entries)
+
+    # Shallow copy so callers can't mutate the cached list
+    if limit:
+        return entries[:limit]
+    return list(entries)
+
+
+# Newest-first orderings per category, keyed on the backing file's mtime
+# like _ENTRIES_CACHE: any write (this process or cron) invalidates them,
+# so repeat context-gathering reads skip both the parse and the sort.
+_RECENT_CACHE: dict[str, tuple[int, list]] = {}
 
 
 def get_recent_entries(category: str, limit: int = 10) -> list:
     """Get most recent entries in a category."""
-    entries = get_all_entries(category)
-    return sorted(entries, key=lambda x: x.get("timestamp", ""), reverse=True)[:limit]
+    path = STORAGE_FILES.get(category)
+    try:
+        mtime = path.stat().st_mtime_ns if path else None
+    except FileNotFoundError:
+        mtime = None
+
+    cached = _RECENT_CACHE.get(category)
+    if cached is None or cached[0] != mtime:
+        ordered = sorted(
+            get_all_entries(category), key=lambda x: x.get("timestamp", ""), reverse=True
+        )
+        _RECENT_CACHE[category] = cached = (mtime, ordered)
+    return cached[1][:limit]
+
+
+def get_recent_entries_multi(categories: list, limit: int = 10) -> dict:
+    """
+    Get most recent entries for several categories in one call.
+
+    Args:
+        categories: Category names to load
+        limit: Maximum entries per category
+
+    Returns:
+        Dict mapping category -> newest-first entry list
+    """
+    return {cat: get_recent_entries(cat, limit) for cat in categories}
 
 
 def add_journal_ref_to_entry(entry_id: str, journal_date: str, link_type: str = "related") -> bool:
@@ -228,9 +336,56 @@ def add_journal_ref_to_entry(entry_id: str, journal_date: str, link_type: str =
 
 
 # --- Audit Logging ---
+#
+# Audit events are appended by a single background thread so mutations
+# don't block on rewriting audit.json; bursts of events collapse into one
+# file write. flush_audit_log() (run at exit and before reads) guarantees
+# nothing queued is lost or missed.
+
+_AUDIT_QUEUE: queue.Queue = queue.Queue()
+_audit_thread = None
+_audit_thread_lock = threading.Lock()
+
+
+def _audit_worker() -> None:
+    while True:
+        batch = [_AUDIT_QUEUE.get()]
+        # Drain whatever else queued up so a burst becomes one rewrite
+        while True:
+            try:
+                batch.append(_AUDIT_QUEUE.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            events = _load_json(AUDIT_FILE)
+            events.extend(batch)
+            _save_json(AUDIT_FILE, events)
+        except Exception as e:
+            import logging
+            logging.getLogger(__name__).warning(f"Failed to write audit batch: {e}")
+        finally:
+            for _ in batch:
+                _AUDIT_QUEUE.task_done()
+
+
+def _ensure_audit_worker() -> None:
+    global _audit_thread
+    if _audit_thread is None:
+        with _audit_thread_lock:
+            if _audit_thread is None:
+                _audit_thread = threading.Thread(target=_audit_worker, daemon=True)
+                _audit_thread.start()
+                atexit.register(flush_audit_log)
+
+
+def flush_audit_log() -> None:
+    """Block until all queued audit events have been written to disk."""
+    if _audit_thread is not None:
+        _AUDIT_QUEUE.join()
+
 
 def log_audit(action: str, item_id: str, category: str, confidence: float = None, details: dict = None) -> None:
-    """Log an audit event."""
+    """Log an audit event (written asynchronously by the audit worker)."""
     event = {
         "ts": datetime.now().isoformat(),
         "action": action,
@@ -242,13 +397,13 @@ def log_audit(action: str, item_id: str, category: str, confidence: float = None
     if details:
         event.update(details)
 
-    events = _load_json(AUDIT_FILE)
-    events.append(event)
-    _save_json(AUDIT_FILE, events)
+    _ensure_audit_worker()
+    _AUDIT_QUEUE.put(event)
 
 
 def get_audit_log(limit: int = 50) -> list:
     """Get recent audit events."""
+    flush_audit_log()
     events = _load_json(AUDIT_FILE)
     return sorted(events, key=lambda x: x.get("ts", ""), reverse=True)[:limit]
 